@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import urllib.parse
+from pairs import document_order, parse_document_name
+from token_cache import text_hash
+
+# views of the corpus in the layout of mdr_articles, besides these a view can be the name of a single url file
+VIEWS = {'all_files': '', 'all_regular': 'r', 'all_easy': 'e'}
+# order of the articles of every view by pair id, the same order as document_order of a directory of articles
+VIEW_ORDER = 'ORDER BY url_file, pair_index, name'
+
+
+# packed store of all downloaded articles in a single sqlite database, every article is written once together with
+# its pair, language, period and text hash, the directories of mdr_articles are queries on the store. Readers such as
+# the dataset builder open the store read-only, which neither creates nor changes the database.
+class ArticleStore:
+    def __init__(self, path, mmap_size=0, read_only=False):
+        self.path = path
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            self.connection = sqlite3.connect('file:{0}?mode=ro'.format(urllib.parse.quote(os.path.abspath(path))),
+                                              uri=True)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.connection = sqlite3.connect(path)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+        # with a memory map readers load the pages of the texts they need from the mapped file on demand
+        if mmap_size:
+            self.connection.execute('PRAGMA mmap_size={0:d}'.format(mmap_size))
+        if not read_only:
+            self.create_tables()
+
+    def create_tables(self):
+        self.connection.execute('CREATE TABLE IF NOT EXISTS articles (name TEXT PRIMARY KEY, url_file TEXT, '
+                                'pair_index INTEGER, language TEXT, period TEXT, text TEXT, text_hash TEXT)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS articles_pair ON articles (url_file, pair_index)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS articles_language ON articles (language)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS articles_period ON articles (period)')
+        self.connection.commit()
+
+    # add or replace an article, the changes are written by the next commit
+    def add(self, document_name, text, period=''):
+        pair, language = parse_document_name(document_name)
+        url_file, pair_index = pair
+        self.connection.execute('INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                (document_name, url_file, pair_index, language, period, text, text_hash(text)))
+
+    def commit(self):
+        self.connection.commit()
+
+    # condition and parameters of the query of a view
+    def view_filter(self, view):
+        if view not in VIEWS:
+            return 'WHERE url_file = ?', (view + '.txt',)
+        if VIEWS[view]:
+            return 'WHERE language = ?', (VIEWS[view],)
+        return '', ()
+
+    # names of the articles of a view ordered by pair id, like the complete pairs of the pair index
+    def names(self, view='all_files'):
+        condition, parameters = self.view_filter(view)
+        return [row[0] for row in self.connection.execute(
+            'SELECT name FROM articles {0} {1}'.format(condition, VIEW_ORDER), parameters)]
+
+    # name, text and text hash of every article of a view, read in a single query
+    def articles(self, view='all_files'):
+        condition, parameters = self.view_filter(view)
+        yield from self.connection.execute(
+            'SELECT name, text, text_hash FROM articles {0} {1}'.format(condition, VIEW_ORDER), parameters)
+
+    # name and text hash of every article of a view, without the texts
+    def hashes(self, view='all_files'):
+        condition, parameters = self.view_filter(view)
+        yield from self.connection.execute(
+            'SELECT name, text_hash FROM articles {0} {1}'.format(condition, VIEW_ORDER), parameters)
+
+    def text(self, document_name):
+        row = self.connection.execute('SELECT text FROM articles WHERE name = ?', (document_name,)).fetchone()
+        if row is None:
+            raise KeyError(document_name)
+        return row[0]
+
+    def text_hash(self, document_name):
+        row = self.connection.execute('SELECT text_hash FROM articles WHERE name = ?', (document_name,)).fetchone()
+        if row is None:
+            raise KeyError(document_name)
+        return row[0]
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+# documents of a directory of article files such as mdr_articles/all_files
+class DirectoryView:
+    def __init__(self, directory):
+        self.name = directory
+        self.directory = directory
+
+    # names of all documents ordered by pair id like the views of the article store, so that both keep the same copy
+    # of a duplicate
+    def names(self):
+        return sorted(os.listdir(self.directory), key=document_order)
+
+    def read(self, filename):
+        with open(os.path.join(self.directory, filename), mode='r') as f:
+            return f.read()
+
+    # file name and text of every document
+    def texts(self):
+        for filename in self.names():
+            yield filename, self.read(filename)
+
+    # file name, text and text hash of every document. The hash of files that did not change since the last build is
+    # taken from the manifest, a file is only read if it changed or its text is not in the manifest, otherwise its text
+    # is None and read again by the stages that need it.
+    def documents(self, manifest):
+        for filename in self.names():
+            path = os.path.join(self.directory, filename)
+            stat = os.stat(path)
+            version = (stat.st_mtime_ns, stat.st_size)
+            key = manifest.lookup(path, version)
+            lines = None
+            if key is None:
+                lines = self.read(filename)
+                key = text_hash(lines)
+                manifest.record(path, version, key)
+            elif key not in manifest:
+                lines = self.read(filename)
+            yield filename, lines, key
+
+    # text hash of a document from the manifest without reading it, None if the file changed since the last build
+    def key(self, filename, manifest):
+        path = os.path.join(self.directory, filename)
+        stat = os.stat(path)
+        return manifest.lookup(path, (stat.st_mtime_ns, stat.st_size))
+
+
+# documents of a view of the article store, with the same methods as a directory view
+class StoreView:
+    def __init__(self, store, view):
+        self.name = store.path + ':' + view
+        self.store = store
+        self.view = view
+
+    def names(self):
+        return self.store.names(self.view)
+
+    def read(self, filename):
+        return self.store.text(filename)
+
+    def texts(self):
+        for filename, lines, key in self.store.articles(self.view):
+            yield filename, lines
+
+    # the text hash of each article is kept in the store, it is recorded in the manifest as the version of the article.
+    # As with a directory only the texts that are not in the manifest are read.
+    def documents(self, manifest):
+        for filename, key in self.store.hashes(self.view):
+            manifest.record(self.name + '/' + filename, key, key)
+            lines = None
+            if key not in manifest:
+                lines = self.read(filename)
+            yield filename, lines, key
+
+    def key(self, filename, manifest):
+        return self.store.text_hash(filename)
+
+
+# view of the corpus, a view of the article store if a store is given, otherwise the given directory
+def corpus_view(directory, store=None, view='all_files'):
+    if store:
+        return StoreView(store, view)
+    return DirectoryView(directory)
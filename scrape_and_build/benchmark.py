@@ -0,0 +1,271 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from article_store import DirectoryView
+from cleaning import clean_article
+from dataset_builder import check_if_over_max_tokens, ingest_directory, remove_duplicates, statistics_and_data
+from extractors import EXTRACTORS, check_extractor, parse_page
+from fetcher import Fetcher
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from manifest import Manifest
+from pairs import read_pair_index
+from run_report import RunReport
+from scrapy import download_document
+from token_cache import TokenCache
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SYLLABLES = ['an', 'be', 'ch', 'de', 'er', 'ge', 'in', 'la', 'mi', 'ne', 'or', 're', 'sch', 'st', 'te', 'un', 'ver',
+             'wa', 'zu', 'ä', 'ö', 'ü', 'ß']
+# url file the fixture pages are listed in, its name contains the year of the fixture period
+FIXTURE_NAME = 'mdr_benchmark_2023'
+
+
+# fixed vocabulary of made up words that look like german words
+def make_vocabulary(generator, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(generator.choice(SYLLABLES) for _ in range(generator.randint(1, 4))))
+    return sorted(words)
+
+
+# paragraphs of a made up article, sentences of regular German are longer than sentences of Leichte Sprache
+def make_paragraphs(generator, vocabulary, easy):
+    sentence_length = (5, 9) if easy else (12, 25)
+    paragraphs = []
+    for _ in range(generator.randint(6, 14)):
+        sentences = []
+        for _ in range(generator.randint(1, 4)):
+            words = [generator.choice(vocabulary) for _ in range(generator.randint(*sentence_length))]
+            sentences.append(words[0].capitalize() + ' ' + ' '.join(words[1:]) + generator.choice('..!?:'))
+        paragraphs.append(' '.join(sentences))
+    return paragraphs
+
+
+# html page of a news article in the markup of the mdr pages, with the credits as last paragraph
+def make_page(generator, vocabulary, easy):
+    paragraphs = make_paragraphs(generator, vocabulary, easy)
+    title = ' '.join(generator.choice(vocabulary) for _ in range(5)).capitalize()
+    body = ['<p class="einleitung">' + paragraphs[0] + '</p>']
+    for paragraph in paragraphs[1:]:
+        if generator.random() < 0.2:
+            body.append('<h3 class="subtitle">' + generator.choice(vocabulary).capitalize() + '</h3>')
+        body.append('<p class="text">' + paragraph + '</p>')
+    body.append('<p class="text">Quelle: MDR, dpa</p>')
+    return ('<html><head><meta charset="utf-8"><title>' + title + '</title>'
+            '<meta name="date" content="2023-10-0' + str(generator.randint(1, 9)) + '">'
+            '<meta name="description" content="' + paragraphs[0][:80] + '">'
+            '<meta name="keywords" content="' + ','.join(generator.sample(vocabulary, 4)) + '">'
+            '</head><body><div class="section">' + ''.join(body) + '</div></body></html>').encode('utf-8')
+
+
+# fixture corpus of pairs of pages in regular German and Leichte Sprache, in the order of a url file, some pairs are
+# copies of earlier pairs so that the duplicate removal has work to do
+def make_fixture_pages(pairs, seed=1, duplicates=0.02):
+    generator = random.Random(seed)
+    vocabulary = make_vocabulary(generator, 5000)
+    pages = []
+    for index in range(pairs):
+        if index and generator.random() < duplicates:
+            original = generator.randrange(index)
+            pages.extend([pages[2 * original], pages[2 * original + 1]])
+        else:
+            pages.extend([make_page(generator, vocabulary, False), make_page(generator, vocabulary, True)])
+    return pages
+
+
+# local stand-in for the mdr web server, serves the fixture pages at /page/<index>
+class FixtureServer:
+    def __init__(self, pages):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body are written separately, so without this every response of a kept alive
+            # connection waits for the delayed ack of the client
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                index = self.path.rsplit('/', 1)[-1]
+                if not index.isdigit() or int(index) >= len(pages):
+                    self.send_error(404)
+                    return
+                content = pages[int(index)]
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def urls(self, count):
+        return ['http://127.0.0.1:{0}/page/{1}'.format(self.server.server_port, index) for index in range(count)]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# peak resident memory in megabytes of this process and of its finished child processes, such as the workers of
+# --jobs, None where the resource module is not available
+def peak_rss():
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on linux and in bytes on macos
+    unit = 2 ** 20 if platform.system() == 'Darwin' else 2 ** 10
+    return [round(resource.getrusage(who).ru_maxrss / unit, 2)
+            for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN]]
+
+
+# run a stage and record its time, the peak of the memory allocated by python in this process while it runs and the
+# peak resident memory of the process and its workers. Tracemalloc does not see the memory of worker processes or
+# memory allocated outside of python's allocators. The resident memory is the peak since the start of the process, so
+# it only grows in the stage that needs more memory than all stages before it.
+def measure(results, stage, function):
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    rss, rss_children = peak_rss()
+    results[stage] = {'seconds': round(seconds, 4), 'peak_python_memory_mb': round(peak / 2 ** 20, 2),
+                      'peak_rss_mb': rss, 'peak_rss_children_mb': rss_children}
+    return result
+
+
+# download all fixture pages from the local server with download_document, which also writes the articles to
+# ./mdr_articles for the build benchmark
+def benchmark_download(pages, workers, extractor):
+    with FixtureServer(pages) as server:
+        url_file = FIXTURE_NAME + '.txt'
+        with open(url_file, 'w') as file:
+            file.write('\n'.join(server.urls(len(pages))) + '\n')
+        fetcher = Fetcher(workers=workers)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            download_document(url_file, FIXTURE_NAME, fetcher, extractor)
+        seconds = time.perf_counter() - start
+        fetcher.close()
+    return {'pages': len(pages), 'workers': workers, 'seconds': round(seconds, 4),
+            'pages_per_second': round(len(pages) / seconds, 2)}
+
+
+# time parsing and cleaning of every fixture page
+def benchmark_parse_clean(pages, extractor):
+    parse_seconds = 0
+    clean_seconds = 0
+    for content in pages:
+        start = time.perf_counter()
+        page = parse_page(content, extractor)
+        paragraphs = page.paragraphs()
+        parse_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        clean_article(paragraphs)
+        clean_seconds += time.perf_counter() - start
+    return {'pages': len(pages), 'parse_ms_per_page': round(1000 * parse_seconds / len(pages), 4),
+            'clean_ms_per_page': round(1000 * clean_seconds / len(pages), 4)}
+
+
+# time and peak memory of each stage of the dataset builder on the downloaded fixture articles, the vocabulary
+# statistics are timed within the statistics and reported on their own as get_vocab. The word frequency plots need a
+# browser to be rendered, so they are only drawn, and their time included in get_vocab, with plots set to True.
+def benchmark_build(max_tokens, jobs, plots=False):
+    dir_regular = DirectoryView('./mdr_articles/all_regular')
+    dir_easy = DirectoryView('./mdr_articles/all_easy')
+    dir_all = DirectoryView('./mdr_articles/all_files')
+    results = {}
+    token_cache = TokenCache()
+    manifest = Manifest()
+    blacklist = set()
+    removed = []
+    statistics_report = RunReport('statistics')
+    tracemalloc.start()
+    try:
+        r_documents, e_documents, all_documents = measure(results, 'ingest_directory', lambda: [
+            ingest_directory(directory, token_cache, manifest, jobs) for directory in [dir_regular, dir_easy, dir_all]])
+        pairs = read_pair_index(dir_regular, dir_easy)
+        measure(results, 'check_if_over_max_tokens', lambda: [
+            check_if_over_max_tokens(documents, manifest, blacklist, max_tokens, pairs)
+            for documents in [r_documents, e_documents]])
+        measure(results, 'remove_duplicates', lambda: [
+            remove_duplicates(documents, blacklist, pairs, removed) for documents in [r_documents, e_documents]])
+        measure(results, 'statistics_and_data', lambda: [
+            statistics_and_data(documents, token_cache, manifest, blacklist, identifyer, {}, jobs,
+                                run_report=statistics_report, plots=plots)
+            for documents, identifyer in [(r_documents, 'Regular German'), (e_documents, 'Leichte Sprache'),
+                                          (all_documents, 'all')]])
+    finally:
+        tracemalloc.stop()
+    # the peak memory of get_vocab is part of the peak memory of statistics_and_data
+    get_vocab_seconds = statistics_report.stages['get_vocab']
+    results['statistics_and_data']['seconds'] = round(results['statistics_and_data']['seconds'] - get_vocab_seconds, 4)
+    results['get_vocab'] = {'seconds': round(get_vocab_seconds, 4)}
+    results['plots'] = plots
+    results['documents'] = len(all_documents)
+    results['removed'] = len(blacklist)
+    return results
+
+
+# benchmark the scraper and the dataset builder on a generated fixture corpus served by a local http server and write
+# the results to a json file, so that the throughput of different versions can be compared
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pairs', type=int, default=500,
+                        help='number of article pairs of the fixture corpus')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='number of threads downloading the fixture pages')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of processes tokenizing the documents in the build')
+    parser.add_argument('--extractor', type=str, default='bs4', choices=EXTRACTORS,
+                        help='extractor used to parse the pages')
+    parser.add_argument('--max-tokens', type=int, default=1024,
+                        help='maximum number of tokens of a document in the build')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='seed of the generated fixture corpus')
+    parser.add_argument('--output', type=str, default='benchmark.json',
+                        help='json file the results are written to')
+    parser.add_argument('--plots', action='store_true',
+                        help='draw the word frequency plots in the build and include their time in get_vocab')
+    args = parser.parse_args()
+    check_extractor(args.extractor)
+
+    output = os.path.abspath(args.output)
+    pages = make_fixture_pages(args.pairs, args.seed)
+    results = {'python': platform.python_version(), 'pairs': args.pairs, 'extractor': args.extractor,
+               'jobs': args.jobs}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # the scraper and the builder write their output to the working directory
+        os.chdir(directory)
+        try:
+            results['download'] = benchmark_download(pages, args.workers, args.extractor)
+            results['parse_clean'] = benchmark_parse_clean(pages, args.extractor)
+            results['build'] = benchmark_build(args.max_tokens, args.jobs, args.plots)
+        finally:
+            os.chdir(cwd)
+
+    print(json.dumps(results, indent=2))
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
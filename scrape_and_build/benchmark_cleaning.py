@@ -0,0 +1,67 @@
+import argparse
+import os
+import re
+import time
+from cleaning import clean_article
+from extractors import check_extractor, parse_page
+from html_cache import HtmlCache
+
+
+# text cleaning as originally done in download_document, kept as reference for the cleaning module
+def reference_clean_article(paragraphs):
+    text = ''
+    p = 0
+    size = len(paragraphs)
+    for p_text in paragraphs:
+        p += 1
+        if p == size:
+            lastline = re.findall('(MDR)|(dpa)', p_text)
+            if lastline:
+                continue
+        text += p_text + '\n'
+    text = re.sub('(\n){3,}', '\n\n', text)
+    text = re.sub('([^a-zA-ZÄÜÖäüößéí\\d:!?\\.\\,\\- \\"\\\'\\n•])', ' ', text)
+    text = re.sub(r'([.!?:])([A-Z])', r'\1 \2', text)
+    return text
+
+
+# time a cleaning function over the paragraphs of all pages, repeated a number of times
+def time_cleaning(function, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for paragraphs in pages:
+            function(paragraphs)
+    return time.perf_counter() - start
+
+
+# time the cleaning module against the reference cleaning over all pages of the html cache, that both clean the same
+# is checked by tests/test_cleaning.py
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('cache', type=str, nargs='?', default='./metadata/html_cache',
+                        help='directory of the html cache written by scrapy.py')
+    parser.add_argument('--extractor', type=str, default='bs4',
+                        help='extractor used to get the paragraphs of each page')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of times all pages are cleaned')
+    args = parser.parse_args()
+    check_extractor(args.extractor)
+
+    cache = HtmlCache(args.cache, 0)
+    pages = []
+    for path in cache.cached_files():
+        key = os.path.basename(path).split('.gz')[0]
+        pages.append(parse_page(cache.load(key), args.extractor).paragraphs())
+
+    reference_time = time_cleaning(reference_clean_article, pages, args.repeat)
+    cleaning_time = time_cleaning(clean_article, pages, args.repeat)
+
+    print('pages: ' + str(len(pages)))
+    print('reference cleaning: {0:.4f}s'.format(reference_time))
+    print('cleaning module: {0:.4f}s'.format(cleaning_time))
+    if cleaning_time:
+        print('speedup: {0:.2f}x'.format(reference_time / cleaning_time))
+
+
+if __name__ == '__main__':
+    main()
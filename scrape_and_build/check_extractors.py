@@ -0,0 +1,50 @@
+import argparse
+import os
+from extractors import check_extractor, parse_page
+from html_cache import HtmlCache
+
+
+# extract title, paragraphs and metadata of a page, errors are part of the output since they decide whether a url
+# file can be downloaded
+def extract(content, extractor):
+    output = {}
+    page = parse_page(content, extractor)
+    for name, value in [('title', page.title), ('paragraphs', page.paragraphs)]:
+        output[name] = value()
+    for name in ['date', 'description', 'keywords']:
+        try:
+            output[name] = page.meta(name)
+        except Exception as error:
+            output[name] = type(error).__name__
+    return output
+
+
+# compare the output of an extractor to the reference bs4 extractor for all pages of the html cache
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('cache', type=str, nargs='?', default='./metadata/html_cache',
+                        help='directory of the html cache written by scrapy.py')
+    parser.add_argument('--extractor', type=str, default='lxml',
+                        help='extractor to compare against the bs4 reference')
+    args = parser.parse_args()
+    check_extractor(args.extractor)
+
+    cache = HtmlCache(args.cache, 0)
+    pages = 0
+    mismatches = 0
+    for path in cache.cached_files():
+        key = os.path.basename(path).split('.gz')[0]
+        content = cache.load(key)
+        reference = extract(content, 'bs4')
+        output = extract(content, args.extractor)
+        pages += 1
+        for name in reference:
+            if reference[name] != output[name]:
+                mismatches += 1
+                print('{0}: {1} differs'.format(key, name))
+                break
+    print('\n{0} of {1} pages differ from the reference extractor'.format(mismatches, pages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import math
+import numpy as np
+import os
+import pandas as pd
+import re
+
+# tokens counted as words of the vocabulary
+VOCABULARY_WORD = re.compile('([a-zA-ZÄÜÖäüößéí\\d])')
+METRICS = ['letters', 'words', 'sentences', 'vocabulary']
+PERCENTILES = [10, 25, 75, 90]
+YEAR = re.compile('(20\\d\\d)')
+
+
+# map the name of every url file below a directory of url files such as mdr_urls to the name of the directory it is
+# in, which is the period it belongs to, e.g. mdr_02.10-06.10 to mdr_2023
+def read_periods(directory):
+    periods = {}
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.endswith('.txt'):
+                periods[file[:-len('.txt')]] = os.path.basename(root)
+    return periods
+
+
+# get the period of a document from the name of the url file it was downloaded from, e.g. r0_mdr_aug_2021.txt, using
+# the year in the name if the url file is not known
+def document_period(filename, periods):
+    name = filename.split('_', 1)[-1]
+    if name.endswith('.txt'):
+        name = name[:-len('.txt')]
+    if name in periods:
+        return periods[name]
+    year = YEAR.search(name)
+    if year:
+        return 'mdr_' + year.group(1)
+    return 'unknown'
+
+
+# average rounded up, 0 if there is nothing to divide by, e.g. for a period whose only document is empty
+def average(total, count):
+    if not count:
+        return 0
+    return math.ceil(total / count)
+
+
+# summarise the per-document metrics of a data frame, all totals, averages, medians and percentiles are computed on
+# whole columns at once
+def summarise(frame, vocab_size):
+    values = frame[METRICS].to_numpy(dtype=np.int64)
+    num_files = len(values)
+    totals = values.sum(axis=0)
+    if not num_files:
+        # medians, percentiles and the maximum of no documents are reported as 0
+        values = np.zeros((1, len(METRICS)), dtype=np.int64)
+    medians = np.median(values, axis=0)
+    percentiles = np.percentile(values, PERCENTILES, axis=0)
+    letters, words, sentences, vocabulary = [int(total) for total in totals]
+    summary = {
+        'files': num_files,
+        'letters': letters,
+        'words': words,
+        'sentences': sentences,
+        'vocabulary_size': int(vocab_size),
+        'letters_per_word': average(letters, words),
+        'words_per_sentence': average(words, sentences),
+        'letters_per_file': average(letters, num_files),
+        'words_per_file': average(words, num_files),
+        'sentences_per_file': average(sentences, num_files),
+        'vocabulary_per_file': average(vocabulary, num_files),
+        'max_words': int(values[:, 1].max()),
+        'median': {},
+        'percentiles': {},
+    }
+    for column, metric in enumerate(METRICS):
+        summary['median'][metric] = float(medians[column])
+        summary['percentiles'][metric] = {'p' + str(percentile): float(percentiles[row][column])
+                                          for row, percentile in enumerate(PERCENTILES)}
+    return summary
+
+
+# per-document metrics of a set of documents, grouped by the period each document was published in
+class CorpusStatistics:
+    def __init__(self, periods=None):
+        self.periods = periods or {}
+        self.documents = []
+
+    def add(self, filename, letters, words, sentences, vocabulary):
+        period = document_period(filename, self.periods)
+        self.documents.append((filename, period, letters, words, sentences, vocabulary))
+
+    # period of every document in the order they were added
+    def document_periods(self):
+        return [document[1] for document in self.documents]
+
+    def frame(self):
+        return pd.DataFrame(self.documents, columns=['document', 'period'] + METRICS)
+
+    def __len__(self):
+        return len(self.documents)
+
+    # summary of all documents and of the documents of each period, given the vocabulary size of all documents and
+    # of each period
+    def summaries(self, vocab_size, period_vocab_sizes):
+        frame = self.frame()
+        summary = summarise(frame, vocab_size)
+        summary['periods'] = {}
+        for period, group in frame.groupby('period', sort=True):
+            summary['periods'][period] = summarise(group, period_vocab_sizes[period])
+        return summary
+
+
+# lines of the statistics report of a summary, printed and written to the statistics files
+def report_lines(summary):
+    return [
+        '\ntotal number of files: ' + str(summary['files']),
+        'total number of letters: ' + str(summary['letters']),
+        'total number of words: ' + str(summary['words']),
+        'total number of sentences: ' + str(summary['sentences']),
+        'total vocabulary size: ' + str(summary['vocabulary_size']),
+        'average number of letters per word: ' + str(summary['letters_per_word']),
+        'average number of words per sentence: ' + str(summary['words_per_sentence']),
+        '\naverage number of letters per file: ' + str(summary['letters_per_file']),
+        'average number of words per file: ' + str(summary['words_per_file']),
+        'average number of sentences per file: ' + str(summary['sentences_per_file']),
+        'average vocabulary size per file: ' + str(summary['vocabulary_per_file']),
+        '\nmedian of the number of letters per file: ' + str(summary['median']['letters']),
+        'median of the number of words per file: ' + str(summary['median']['words']),
+        'median of the number of sentences per file: ' + str(summary['median']['sentences']),
+        'median of the vocabulary size per file: ' + str(summary['median']['vocabulary']),
+        '\nmaximum number of words per file: ' + str(summary['max_words']),
+    ]
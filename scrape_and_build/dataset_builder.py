@@ -1,78 +1,244 @@
 import argparse
+import contextlib
 import hvplot
 import itertools
-import math
-import numpy as np
+import json
 import os
 import re
 import pandas as pd
+from article_store import ArticleStore, corpus_view
 from bokeh.models import NumeralTickFormatter
-from nltk.corpus import stopwords
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from corpus_statistics import VOCABULARY_WORD, CorpusStatistics, document_period, read_periods, report_lines
+from manifest import Manifest
+from near_duplicates import NearDuplicateIndex
 from nltk import word_tokenize
+from output_formats import OUTPUT_FORMATS, TableWriter, write_table
+from pairs import read_pair_index
+from run_report import Progress, RunReport
+from subword_lengths import SubwordTokenizer
+from token_cache import TokenCache, text_hash
+from vocabulary import (TermDocumentMatrix, counter_statistics, counter_vocabulary_size, group_vocabulary_sizes,
+                        load_term_counts, vocabulary_statistics)
+
+
+# apply a function to every given document, either in this process or in a pool of worker processes, the results
+# are returned in the order of the documents and counted in the progress
+def map_documents(function, documents, jobs, progress=None):
+    results = []
+    if jobs <= 1 or len(documents) < 2:
+        for document in documents:
+            results.append(function(document))
+            if progress:
+                progress.update()
+        return results
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for result in executor.map(function, documents, chunksize=max(1, len(documents) // (jobs * 4))):
+            results.append(result)
+            if progress:
+                progress.update()
+    return results
+
+
+# tokenize the text of a single document and compute its statistics
+def analyse_text(lines):
+    words_tokenized = word_tokenize(lines)
+    return words_tokenized, count_sentences(lines), len(''.join(words_tokenized)), vocab_individual_texts(
+        words_tokenized)
+
+
+# number of words, sentences, letters and vocabulary size of an analysed document, as kept in the manifest
+def document_metrics(analysis):
+    words_tokenized, sents_document, letters_document, vocab_size_file = analysis
+    return len(words_tokenized), sents_document, letters_document, vocab_size_file
+
+
+# reason to remove a document found in its text, 'page not found' for error pages, 'empty' for empty articles and an
+# empty string otherwise
+def text_status(lines):
+    if re.findall('(Seite nicht gefunden)', lines):
+        return 'page not found'
+    if lines == '\n\n':
+        return 'empty'
+    return ''
+
+
+# text of a document, read from its directory or view of the article store if it was not read by the ingestion
+def document_text(directory, filename, lines):
+    if lines is None:
+        return directory.read(filename)
+    return lines
+
+
+# read the new and changed documents of a directory or view of the article store and tokenize every text whose
+# metrics are not yet in the manifest, the text hash of files that did not change since the last build is taken from
+# the manifest. Returns the file name, text and text hash of each document in directory order, the text is None for
+# documents that were not read.
+def ingest_directory(directory, token_cache, manifest, jobs=1):
+    documents = list(directory.documents(manifest))
+    new_texts = {}
+    for filename, lines, key in documents:
+        if key in manifest or key in new_texts:
+            continue
+        manifest.add_status(key, text_status(lines))
+        if key in manifest:
+            # only the status was missing, e.g. in the manifest of an earlier build
+            continue
+        if key in token_cache:
+            manifest.add(key, document_metrics(token_cache.get(key)))
+        else:
+            new_texts[key] = lines
+    if new_texts:
+        progress = Progress('tokenized ' + directory.name, len(new_texts))
+        analyses = map_documents(analyse_text, list(new_texts.values()), jobs, progress)
+        progress.close()
+        for key, analysis in zip(new_texts.keys(), analyses):
+            token_cache.add(key, analysis)
+            manifest.add(key, document_metrics(analysis))
+    return documents
+
+
+# read the documents of a directory or view of the article store one at a time, skipping the given file names
+def stream_directory(directory, skip=()):
+    for filename, lines in directory.texts():
+        if filename not in skip:
+            yield filename, lines
+
+
+# tokenize and analyse the documents of a directory in batches, so that only one batch of documents is held in memory,
+# yields the file name, text, text hash and analysis of each document in directory order
+def stream_analysed(directory, jobs=1, skip=(), batch_size=256):
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    progress = Progress('tokenized ' + directory.name)
+    try:
+        documents = stream_directory(directory, skip)
+        while True:
+            batch = list(itertools.islice(documents, batch_size))
+            if not batch:
+                break
+            texts = [lines for filename, lines in batch]
+            if executor:
+                analyses = executor.map(analyse_text, texts)
+            else:
+                analyses = map(analyse_text, texts)
+            for (filename, lines), analysis in zip(batch, analyses):
+                yield filename, lines, text_hash(lines), analysis
+            progress.update(len(batch))
+    finally:
+        progress.close()
+        if executor:
+            executor.shutdown()
+
+
+# streaming version of the length filter, passes each document on to the duplicate removal. With a subword tokenizer
+# the documents are measured one batch at a time.
+def stream_length_filter(documents, blacklist, max, pairs, tokenizer=None, run_report=None, batch_size=256):
+    while True:
+        batch = list(itertools.islice(documents, batch_size))
+        if not batch:
+            break
+        if tokenizer:
+            lengths = tokenizer.lengths([lines for filename, lines, key, analysis in batch])
+        else:
+            lengths = [len(analysis[0]) for filename, lines, key, analysis in batch]
+        for (filename, lines, key, analysis), length in zip(batch, lengths):
+            if length > max:
+                blacklist_pair(blacklist, filename, pairs)
+                if run_report:
+                    run_report.count('too_long')
+            yield filename, lines, key
+
+
+# length of every document text by its text hash, the number of its word tokens or, with a subword tokenizer, the
+# number of its subword tokens. Subword lengths are computed in batches for the texts whose length is not yet in the
+# manifest, the texts that were not read by the ingestion are read from the directory.
+def document_lengths(documents, manifest, tokenizer=None, directory=None):
+    if tokenizer is None:
+        return {key: manifest.get(key)[0] for filename, lines, key in documents}
+    missing = {}
+    for filename, lines, key in documents:
+        if manifest.length(tokenizer.name, key) is None and key not in missing:
+            missing[key] = document_text(directory, filename, lines)
+    for key, length in zip(missing.keys(), tokenizer.lengths(list(missing.values()))):
+        manifest.add_length(tokenizer.name, key, length)
+    return {key: manifest.length(tokenizer.name, key) for filename, lines, key in documents}
+
+
+# filter out documents that contain more tokens than the given number, the number of filtered documents is counted in
+# the run report
+def check_if_over_max_tokens(documents, manifest, blacklist, max, pairs, tokenizer=None, run_report=None,
+                             directory=None):
+    lengths = document_lengths(documents, manifest, tokenizer, directory)
+    for filename, lines, key in documents:
+        if lengths[key] > max:
+            blacklist_pair(blacklist, filename, pairs)
+            if run_report:
+                run_report.count('too_long')
+    return blacklist
+
 
+# add a document and its pair in the other language from the pair index to the blacklist, returns the name of the pair
+def blacklist_pair(blacklist, filename, pairs):
+    pair = pairs.partner(filename)
+    blacklist.add(filename)
+    if pair:
+        blacklist.add(pair)
+    return pair or ''
 
-# filter out documents that contain more tokens than the given number
-def check_if_over_max_tokens(directory, blacklist, max, easy):
-    files = os.listdir(directory)
-    for filename in files:
-        with open(os.path.join(directory, filename), mode='r') as f:
-            lines = f.read()
-            words_list = word_tokenize(lines)
-            words = len(words_list)
-            if words > max:
-                if filename not in blacklist:
-                    blacklist.append(filename)
-                if easy:
-                    pair = 'r' + filename[1:]
-                else:
-                    pair = 'e' + filename[1:]
-                if pair not in blacklist:
-                    blacklist.append(pair)
+
+# remove documents whose pair in the other language is missing, they cannot be part of the dataset
+def remove_unpaired(pairs, blacklist, report):
+    for filename in pairs.unpaired():
+        blacklist.add(filename)
+        report.append({'Document_Name': filename, 'Pair': '', 'Reason': 'missing pair', 'Duplicate_Of': '',
+                       'Similarity': ''})
     return blacklist
 
 
-# remove duplicate articles and their pairs, excluding them from the dataset
-def remove_duplicates(directory, blacklist, easy):
-    files = os.listdir(directory)
-    all_files = []
-    for filename in files:
-        with open(os.path.join(directory, filename), mode='r') as f:
-            lines = f.read()
-            page_not_found = re.findall('(Seite nicht gefunden)', lines)
-            if lines in all_files or page_not_found or lines == '\n\n':
-                if filename not in blacklist:
-                    blacklist.append(filename)
-                if easy:
-                    pair = 'r' + filename[1:]
-                else:
-                    pair = 'e' + filename[1:]
-                if pair not in blacklist:
-                    blacklist.append(pair)
-            else:
-                all_files.append(lines)
+# remove duplicate articles and their pairs, excluding them from the dataset. Duplicates are found by the hash of their
+# text, with a similarity threshold articles that are nearly identical to an earlier article are removed as well. Each
+# removed article is added to the report with the reason for its removal. With a manifest, empty articles and error
+# pages are found by the status of their text in the manifest, so that only the near-duplicate search reads the texts
+# that were not read by the ingestion.
+def remove_duplicates(documents, blacklist, pairs, report, threshold=None, manifest=None, directory=None):
+    all_files = {}
+    near_duplicates = None
+    if threshold:
+        near_duplicates = NearDuplicateIndex(threshold)
+    for filename, lines, key in documents:
+        reason = ''
+        original = ''
+        similarity = ''
+        status = manifest.status(key) if manifest else text_status(lines)
+        if status:
+            reason = status
+        elif key in all_files:
+            reason = 'duplicate'
+            original = all_files[key]
+            similarity = 1.0
+        elif near_duplicates:
+            original, similarity = near_duplicates.find_or_add(filename, document_text(directory, filename, lines))
+            if original:
+                reason = 'near duplicate'
+        if reason:
+            pair = blacklist_pair(blacklist, filename, pairs)
+            report.append({'Document_Name': filename, 'Pair': pair, 'Reason': reason, 'Duplicate_Of': original,
+                           'Similarity': similarity})
+        else:
+            all_files[key] = filename
     return blacklist
 
 
-# get the vocabulary size of individual documents using frequency info
+# get the vocabulary size of individual documents as the number of distinct words
 def vocab_individual_texts(data):
-    data = [word for word in data if re.match('([a-zA-ZÄÜÖäüößéí\d])', word)]
-    word_freq_total = pd.Series(data).value_counts()
-    vocab_size = word_freq_total.size
-    return vocab_size
+    return len({word for word in data if VOCABULARY_WORD.match(word)})
 
 
-# get the vocabulary size and other statistics for all of the given documents
-def get_vocab(data, dataset_identifyer):
-    data = list(itertools.chain.from_iterable(data))
-    data = [word for word in data if re.match('([a-zA-ZÄÜÖäüößéí\d])', word)]
-    word_freq_total = pd.Series(data).value_counts()
-    vocab_size = word_freq_total.size
-    german_stop_words = stopwords.words('german')
-    vocabulary_words = word_freq_total.index.values
-    words_cleaned = [word for word in data if word.lower() not in german_stop_words and not re.match(
-        '(mdr.de)', word.lower())]
-    word_freq_cleaned = pd.Series(words_cleaned).value_counts()
-    cleaned_vocab_words = word_freq_cleaned.index.values
+# plot the most common cleaned words and write them to image files
+def plot_word_freq(word_freq_cleaned, dataset_identifyer):
     plot = word_freq_cleaned[1:25].rename(
         "Word frequency of most common cleaned words in {0} documents".format(dataset_identifyer)).hvplot.bar(
         rot=45
@@ -81,44 +247,111 @@ def get_vocab(data, dataset_identifyer):
     table = word_freq_cleaned[1:50].reset_index(
         name="frequency").hvplot.table()  # columns=['words', 'frequency'], selectable=True
     hvplot.save(table, '{0}_words_by_freq.png'.format(dataset_identifyer), fmt='png')
+
+
+# file the term-document matrix of a subset of the dataset is saved to
+def term_document_path(dataset_identifyer):
+    return './statistics/term_document_{0}.npz'.format(dataset_identifyer.replace(' ', '_'))
+
+
+# vocabulary size, vocabulary and cleaned vocabulary of a subset of the dataset from its word frequencies, the most
+# common cleaned words are plotted unless plots is False
+def vocabulary_results(word_freq_total, word_freq_cleaned, dataset_identifyer, plots=True):
+    vocab_size = word_freq_total.size
+    vocabulary_words = word_freq_total.index.values
+    cleaned_vocab_words = word_freq_cleaned.index.values
+    if plots:
+        plot_word_freq(word_freq_cleaned, dataset_identifyer)
     return vocab_size, vocabulary_words, word_freq_cleaned, cleaned_vocab_words
 
 
-# get text from documents and analyse data
-def statistics_and_data(directory, blacklist, dataset_identifyer):
-    files = os.listdir(directory)
-    max_len = 0
+# get the vocabulary size and other statistics for all of the given documents from their term-document matrix, the
+# matrix is saved to the statistics directory for later analyses
+def get_vocab(term_documents, dataset_identifyer, plots=True):
+    word_freq_total, word_freq_cleaned = vocabulary_statistics(term_documents.matrix(), term_documents.terms())
+    results = vocabulary_results(word_freq_total, word_freq_cleaned, dataset_identifyer, plots)
+    term_documents.save(term_document_path(dataset_identifyer))
+    return results
+
+
+# get text from documents by file name and analyse data, the metrics of each document are taken from the manifest and
+# its token counts from the token cache or, for documents that were not tokenized by this build, from the
+# term-document matrix saved by the last build. The texts that were not read by the ingestion are only read if they
+# need to be tokenized and are returned as None. With a run report the vocabulary statistics and plots are timed as
+# their own stage get_vocab, with plots set to False the word frequencies are not plotted.
+def statistics_and_data(documents, token_cache, manifest, blacklist, dataset_identifyer, periods=None, jobs=1,
+                        directory=None, run_report=None, plots=True):
     data = {}
-    data_word_tokenized = {}
-    words = []
-    sents = []
-    letters = []
-    vocab_per_document = []
-    count = 0
-    files_removed = 0
-    for filename in files:
-        with open(os.path.join(directory, filename), mode='r') as f:
-            if filename in blacklist:
-                files_removed += 1
-            if filename not in blacklist:
-                lines = f.read()
-                words_tokenized = word_tokenize(lines)
-                words_document = len(words_tokenized)
-                if words_document > max_len:
-                    max_len = words_document
-                sents_document = count_sentences(lines)
-                words.append(words_document)
-                sents.append(sents_document)
-                letters.append(len(''.join(words_tokenized)))
-                vocab_size_file = vocab_individual_texts(words_tokenized)
-                vocab_per_document.append(vocab_size_file)
-                data[count] = lines
-                data_word_tokenized[count] = words_tokenized
-                count += 1
-    vocab_size, vocabulary_words, word_freq_cleaned, words_cleaned = get_vocab(data_word_tokenized.values(),
-                                                                               dataset_identifyer)
-
-    return letters, words, sents, max_len, data, vocab_size, vocabulary_words, vocab_per_document, word_freq_cleaned, words_cleaned
+    statistics = CorpusStatistics(periods)
+    term_documents = TermDocumentMatrix()
+    documents = [(filename, lines, key) for filename, lines, key in documents if filename not in blacklist]
+    term_counts = {}
+    if any(key not in token_cache for filename, lines, key in documents):
+        term_counts = load_term_counts(term_document_path(dataset_identifyer))
+    missing = {}
+    for filename, lines, key in documents:
+        if key not in token_cache and key not in term_counts and key not in missing:
+            missing[key] = document_text(directory, filename, lines)
+    for key, analysis in zip(missing.keys(), map_documents(analyse_text, list(missing.values()), jobs)):
+        token_cache.add(key, analysis)
+    for filename, lines, key in documents:
+        words, sents_document, letters_document, vocab_size_file = manifest.get(key)
+        statistics.add(filename, letters_document, words, sents_document, vocab_size_file)
+        if key in token_cache:
+            term_documents.add(filename, token_cache.tokens(key), key)
+        else:
+            term_documents.add_terms(filename, *term_counts[key], key)
+        data[filename] = lines
+    with run_report.stage('get_vocab') if run_report else contextlib.nullcontext():
+        vocab_size, vocabulary_words, word_freq_cleaned, words_cleaned = get_vocab(term_documents, dataset_identifyer,
+                                                                                   plots)
+    summary = statistics.summaries(vocab_size, group_vocabulary_sizes(term_documents.matrix(), term_documents.terms(),
+                                                                      statistics.document_periods()))
+
+    return summary, data, vocab_size, vocabulary_words, word_freq_cleaned, words_cleaned
+
+
+# streaming version of statistics_and_data, the documents are analysed one batch at a time and only the metrics of
+# each document and the token counts of all documents and of each period are kept in memory. No term-document matrix
+# is built or saved, its size grows with the number of documents. The text of the documents is not returned.
+def stream_statistics(directory, blacklist, dataset_identifyer, periods=None, jobs=1):
+    statistics = CorpusStatistics(periods)
+    term_counts = Counter()
+    period_term_counts = {}
+    for filename, lines, key, analysis in stream_analysed(directory, jobs, blacklist):
+        words_tokenized, sents_document, letters_document, vocab_size_file = analysis
+        statistics.add(filename, letters_document, len(words_tokenized), sents_document, vocab_size_file)
+        term_counts.update(words_tokenized)
+        period_term_counts.setdefault(document_period(filename, statistics.periods), Counter()).update(words_tokenized)
+    word_freq_total, word_freq_cleaned = counter_statistics(term_counts)
+    vocab_size, vocabulary_words, word_freq_cleaned, words_cleaned = vocabulary_results(word_freq_total,
+                                                                                        word_freq_cleaned,
+                                                                                        dataset_identifyer)
+    summary = statistics.summaries(vocab_size, {period: counter_vocabulary_size(counts)
+                                                for period, counts in period_term_counts.items()})
+
+    return summary, vocab_size, vocabulary_words, word_freq_cleaned, words_cleaned
+
+
+# texts of the regular and Leichte Sprache document of every pair that is not in the blacklist, joined by the pair
+# index in the order of the pairs, texts that were not read by the ingestion are read from the directories
+def pair_rows(pairs, blacklist, r_data, e_data, dir_regular=None, dir_easy=None):
+    return [(document_text(dir_regular, r_filename, r_data[r_filename]),
+             document_text(dir_easy, e_filename, e_data[e_filename]))
+            for r_filename, e_filename in pairs.complete_pairs(blacklist)]
+
+
+# write the dataset and its small version with 100 samples row by row, reading one pair of documents at a time
+def stream_dataset(dir_regular, dir_easy, pairs, blacklist, name_tokens, output_format='csv'):
+    header = ['Regular German', 'Leichte Sprache']
+    with TableWriter('EasyGerman{0}'.format(name_tokens), header, output_format) as writer, \
+            TableWriter('EasyGerman{0}_small'.format(name_tokens), header, output_format) as writer_small:
+        for count, (r_filename, e_filename) in enumerate(pairs.complete_pairs(blacklist)):
+            r_lines = dir_regular.read(r_filename)
+            e_lines = dir_easy.read(e_filename)
+            writer.write([r_lines, e_lines])
+            if count < 100:
+                writer_small.write([r_lines, e_lines])
 
 
 # count the number of sentences using regular expressions
@@ -129,23 +362,12 @@ def count_sentences(text):
 
 
 # print and write out individual statistics
-def print_and_write_data(max_tokens, max_len, num_files, vocab_size, vocab_file, letters, words, sents, language):
-    print('\ntotal number of files: ' + str(num_files))
-    print('total number of letters: ' + str(sum(letters)))
-    print('total number of words: ' + str(sum(words)))
-    print('total number of sentences: ' + str(sum(sents)))
-    print('total vocabulary size: ' + str(vocab_size))
-    print('average number of letters per word: ' + str(math.ceil(sum(letters) / sum(words))))
-    print('average number of words per sentence: ' + str(math.ceil(sum(words) / sum(sents))))
-    print('\naverage number of letters per file: ' + str(math.ceil(sum(letters) / num_files)))
-    print('average number of words per file: ' + str(math.ceil(sum(words) / num_files)))
-    print('average number of sentences per file: ' + str(math.ceil(sum(sents) / num_files)))
-    print('average vocabulary size per file: ' + str(math.ceil(sum(vocab_file) / num_files)))
-    print('\nmedian of the number of letters per file: ' + str(np.median(letters)))
-    print('median of the number of words per file: ' + str(np.median(words)))
-    print('median of the number of sentences per file: ' + str(np.median(sents)))
-    print('median of the vocabulary size per file: ' + str(np.median(vocab_file)))
-    print('\nmaximum number of words per file: ' + str(max_len) + '\n')
+def print_and_write_data(max_tokens, summary, language, output=True):
+    lines = report_lines(summary)
+    if output:
+        for line in lines:
+            print(line)
+        print()
 
     filename = 'statistics_easyGerman_{0}'.format(max_tokens)
     if language:
@@ -157,40 +379,27 @@ def print_and_write_data(max_tokens, max_len, num_files, vocab_size, vocab_file,
 
     with open(save_path + '/' + filename, 'w') as file:
         file.write('Dataset EasyGerman {0}\n'.format(language.capitalize()))
-        file.write('\ntotal number of files: ' + str(num_files) + '\n')
-        file.write('total number of letters: ' + str(sum(letters)) + '\n')
-        file.write('total number of words: ' + str(sum(words)) + '\n')
-        file.write('total number of sentences: ' + str(sum(sents)) + '\n')
-        file.write('total vocabulary size: ' + str(vocab_size) + '\n')
-        file.write('average number of letters per word: ' + str(math.ceil(sum(letters) / sum(words))) + '\n')
-        file.write('average number of words per sentence: ' + str(math.ceil(sum(words) / sum(sents))) + '\n')
-        file.write('\naverage number of letters per file: ' + str(math.ceil(sum(letters) / num_files)) + '\n')
-        file.write('average number of words per file: ' + str(math.ceil(sum(words) / num_files)) + '\n')
-        file.write('average number of sentences per file: ' + str(math.ceil(sum(sents) / num_files)) + '\n')
-        file.write('average vocabulary size per file: ' + str(math.ceil(sum(vocab_file) / num_files)) + '\n')
-        file.write('\nmedian of the number of letters per file: ' + str(np.median(letters)) + '\n')
-        file.write('median of the number of words per file: ' + str(np.median(words)) + '\n')
-        file.write('median of the number of sentences per file: ' + str(np.median(sents)) + '\n')
-        file.write('median of the vocabulary size per file: ' + str(np.median(vocab_file)) + '\n')
-        file.write('\nmaximum number of words per file: ' + str(max_len) + '\n')
-
-
-# all calls to print and write different parts of data
-def print_statistics(max_tokens, r_max_len, r_num_files, r_vocab_size, r_vocab_file, r_letters, r_words, r_sents,
-                     e_max_len, e_num_files, e_vocab_size, e_vocab_file, e_letters, e_words, e_sents,
-                     all_max_len, all_num_files, all_vocab_size, all_vocab_file, all_letters, all_words, all_sents):
+        for line in lines:
+            file.write(line + '\n')
+
+
+# all calls to print and write different parts of data, the statistics of all subsets and of each period are also
+# written to a json file
+def print_statistics(max_tokens, r_summary, e_summary, all_summary):
     print('\n-------------------------------------------------------------------')
     print('\nDocuments Regular German\n')
-    print_and_write_data(max_tokens, r_max_len, r_num_files, r_vocab_size, r_vocab_file, r_letters, r_words, r_sents,
-                         language='regular')
+    print_and_write_data(max_tokens, r_summary, language='regular')
     print('-------------------------------------------------------------------')
     print('\nDocuments Easy-to-read German\n')
-    print_and_write_data(max_tokens, e_max_len, e_num_files, e_vocab_size, e_vocab_file, e_letters, e_words, e_sents,
-                         language='easy-to-read')
+    print_and_write_data(max_tokens, e_summary, language='easy-to-read')
     print('-------------------------------------------------------------------')
     print('\nDocuments entire Datset\n')
-    print_and_write_data(max_tokens, all_max_len, all_num_files, all_vocab_size, all_vocab_file, all_letters, all_words,
-                         all_sents, '')
+    print_and_write_data(max_tokens, all_summary, '')
+    for period, summary in all_summary['periods'].items():
+        print_and_write_data(max_tokens, summary, period, output=False)
+
+    with open('./statistics/statistics_easyGerman_{0}.json'.format(max_tokens), 'w') as file:
+        json.dump({'regular': r_summary, 'easy-to-read': e_summary, 'all': all_summary}, file, indent=2)
 
 
 def main():
@@ -204,13 +413,37 @@ def main():
                         help='directory of documents containing regular german')
     parser.add_argument('dir_easy', type=str, nargs='?',
                         help='directory of documents containing easy german')
+    parser.add_argument('--article-store', type=str, default=None,
+                        help='article store written by scrapy.py, the documents are read from its views all_files, all_regular and all_easy instead of the directories')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of processes used to tokenize and analyse the documents')
+    parser.add_argument('--token-cache', type=str, default=None,
+                        help='file to keep the tokens of all documents in, so that unchanged documents are not tokenized again by the next build')
+    parser.add_argument('--near-duplicates', type=float, default=None,
+                        help='also remove documents whose estimated word shingle similarity to an earlier document is at least this threshold, e.g. 0.9')
+    parser.add_argument('--streaming', action='store_true',
+                        help='build the dataset with bounded memory, documents are read and tokenized one batch at a time')
+    parser.add_argument('--periods', type=str,
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mdr_urls'),
+                        help='directory of url files grouped into periods, statistics are also computed for each period')
+    parser.add_argument('--output-format', type=str, default='csv', choices=OUTPUT_FORMATS,
+                        help='file format of the dataset, parquet and arrow are compressed columnar formats')
+    parser.add_argument('--manifest', type=str, default=None,
+                        help='file to keep the hash and metrics of every document in, so that the next build only tokenizes new or changed documents')
+    parser.add_argument('--report', type=str, default='./statistics/run_report.json',
+                        help='json file the timings, counters and reasons for removed documents of the build are written to')
+    parser.add_argument('--length-tokenizer', type=str, default=None,
+                        help='local tokenizer.json file or directory of a fast tokenizer, max_tokens is then the maximum number of its subword tokens instead of word tokens')
 
     args = parser.parse_args()
+    if args.manifest and args.streaming:
+        parser.error('--manifest cannot be used with --streaming')
+    jobs = args.jobs
     dir_regular = args.dir_regular
     dir_easy = args.dir_easy
     dir_all = args.dir_all
     max_tokens = 1024
-    blacklist = []
+    blacklist = set()
 
     if not dir_regular:
         dir_regular = dir_regular
@@ -220,47 +453,111 @@ def main():
         dir_all = dir_all
     if max_tokens:
         max_tokens = int(args.max_tokens)
+    # read the documents from the article store or from the directories
+    store = None
+    if args.article_store:
+        store = ArticleStore(args.article_store, read_only=True)
+    dir_regular = corpus_view(dir_regular, store, 'all_regular')
+    dir_easy = corpus_view(dir_easy, store, 'all_easy')
+    dir_all = corpus_view(dir_all, store, 'all_files')
 
-    blacklist = check_if_over_max_tokens(dir_regular, blacklist, max_tokens, False)
-    blacklist = check_if_over_max_tokens(dir_easy, blacklist, max_tokens, True)
     name_tokens = '_' + str(max_tokens)
-
-    blacklist = remove_duplicates(dir_regular, blacklist, False)
-    blacklist = remove_duplicates(dir_easy, blacklist, True)
+    report = RunReport('dataset_builder')
+    tokenizer = None
+    if args.length_tokenizer:
+        tokenizer = SubwordTokenizer(args.length_tokenizer)
+    periods = read_periods(args.periods)
+    removed_duplicates = []
+    # pair every regular document with its Leichte Sprache document by pair id
+    with report.stage('pair_index'):
+        pairs = read_pair_index(dir_regular, dir_easy)
+        blacklist = remove_unpaired(pairs, blacklist, removed_duplicates)
+    report.count('pairs', len(pairs))
+    if args.streaming:
+        # filter by length and remove duplicates in a single pass over each directory, keeping only the text hashes
+        with report.stage('filter'):
+            for directory in [dir_regular, dir_easy]:
+                documents = stream_length_filter(stream_analysed(directory, jobs), blacklist, max_tokens, pairs,
+                                                 tokenizer, report)
+                blacklist = remove_duplicates(documents, blacklist, pairs, removed_duplicates, args.near_duplicates)
+    else:
+        # read and tokenize every unique document once, all later stages use the tokens from the cache
+        # with a manifest only new or changed documents are tokenized
+        with report.stage('ingest'):
+            token_cache = TokenCache(args.token_cache)
+            manifest = Manifest(args.manifest)
+            cached_texts = len(token_cache)
+            r_documents = ingest_directory(dir_regular, token_cache, manifest, jobs)
+            e_documents = ingest_directory(dir_easy, token_cache, manifest, jobs)
+            all_documents = ingest_directory(dir_all, token_cache, manifest, jobs)
+        report.count('documents', len(all_documents))
+        report.count('texts_tokenized', len(token_cache) - cached_texts)
+
+        with report.stage('length_filter'):
+            blacklist = check_if_over_max_tokens(r_documents, manifest, blacklist, max_tokens, pairs, tokenizer, report,
+                                                 dir_regular)
+            blacklist = check_if_over_max_tokens(e_documents, manifest, blacklist, max_tokens, pairs, tokenizer, report,
+                                                 dir_easy)
+            manifest.save()
+
+        with report.stage('remove_duplicates'):
+            blacklist = remove_duplicates(r_documents, blacklist, pairs, removed_duplicates, args.near_duplicates,
+                                          manifest, dir_regular)
+            blacklist = remove_duplicates(e_documents, blacklist, pairs, removed_duplicates, args.near_duplicates,
+                                          manifest, dir_easy)
     print('\n- ' + str(len(blacklist)) + ' samples were removed -\n')
-
-    # get all the statistical data and the text from each document
-    r_letters, r_words, r_sents, r_max_len, r_data, r_vocab_size, r_vocabulary, r_vocab_per_document, r_word_freq_cleaned, r_words_cleaned = statistics_and_data(
-        dir_regular, blacklist, 'Regular German')
-    e_letters, e_words, e_sents, e_max_len, e_data, e_vocab_size, e_vocabulary, e_vocab_per_document, e_word_freq_cleaned, e_words_cleaned = statistics_and_data(
-        dir_easy, blacklist, 'Leichte Sprache')
-    all_letters, all_words, all_sents, all_max_len, all_data, all_vocab_size, all_vocabulary, all_vocab_per_document, all_word_freq_cleaned, all_words_cleaned = statistics_and_data(
-        dir_all, blacklist, 'all')
-
-    r_num_files = len(r_data)
-    e_num_files = len(e_data)
-    all_num_files = len(all_data)
-
-    # print and write data to file
-    print_statistics(max_tokens, r_max_len, r_num_files, r_vocab_size, r_vocab_per_document, r_letters, r_words,
-                     r_sents,
-                     e_max_len, e_num_files, e_vocab_size, e_vocab_per_document, e_letters, e_words, e_sents,
-                     all_max_len, all_num_files, all_vocab_size, all_vocab_per_document, all_letters, all_words,
-                     all_sents
-                     )
-
-    # build dataset as csv file
-    df = pd.DataFrame()
-    df['Regular German'] = r_data.values()
-    df['Leichte Sprache'] = e_data.values()
-    df.columns = ['Regular German', 'Leichte Sprache']
-    df.to_csv('EasyGerman{0}.csv'.format(name_tokens), encoding='utf-8', index=False)
-    # build small version with 100 samples for testing as csv file
-    df_small = pd.DataFrame()
-    df_small['Regular German'] = list(r_data.values())[:100]
-    df_small['Leichte Sprache'] = list(e_data.values())[:100]
-    df_small.columns = ['Regular German', 'Leichte Sprache']
-    df_small.to_csv('EasyGerman{0}_small.csv'.format(name_tokens), encoding='utf-8', index=False)
+    report.count('removed', len(blacklist))
+    for removed in removed_duplicates:
+        report.record('removal_reason', removed['Reason'])
+    # write which documents were removed as duplicates and why
+    df_removed = pd.DataFrame(removed_duplicates,
+                              columns=['Document_Name', 'Pair', 'Reason', 'Duplicate_Of', 'Similarity'])
+    df_removed.to_csv('removed_duplicates{0}.csv'.format(name_tokens), encoding='utf-8', index=False)
+
+    with report.stage('statistics'):
+        if args.streaming:
+            # get all the statistical data, the documents are read again one batch at a time
+            r_summary, r_vocab_size, r_vocabulary, r_word_freq_cleaned, r_words_cleaned = stream_statistics(
+                dir_regular, blacklist, 'Regular German', periods, jobs)
+            e_summary, e_vocab_size, e_vocabulary, e_word_freq_cleaned, e_words_cleaned = stream_statistics(
+                dir_easy, blacklist, 'Leichte Sprache', periods, jobs)
+            all_summary, all_vocab_size, all_vocabulary, all_word_freq_cleaned, all_words_cleaned = stream_statistics(
+                dir_all, blacklist, 'all', periods, jobs)
+        else:
+            # get all the statistical data and the text from each document, the time of the vocabulary statistics
+            # and plots is reported as get_vocab within the statistics
+            r_summary, r_data, r_vocab_size, r_vocabulary, r_word_freq_cleaned, r_words_cleaned = statistics_and_data(
+                r_documents, token_cache, manifest, blacklist, 'Regular German', periods, jobs, dir_regular,
+                run_report=report)
+            e_summary, e_data, e_vocab_size, e_vocabulary, e_word_freq_cleaned, e_words_cleaned = statistics_and_data(
+                e_documents, token_cache, manifest, blacklist, 'Leichte Sprache', periods, jobs, dir_easy,
+                run_report=report)
+            all_summary, all_data, all_vocab_size, all_vocabulary, all_word_freq_cleaned, all_words_cleaned = \
+                statistics_and_data(all_documents, token_cache, manifest, blacklist, 'all', periods, jobs, dir_all,
+                                    run_report=report)
+            # tokens of the documents tokenized by the statistics are saved as well
+            token_cache.save()
+
+        # print and write data to file
+        print_statistics(max_tokens, r_summary, e_summary, all_summary)
+
+    with report.stage('write_dataset'):
+        if args.streaming:
+            stream_dataset(dir_regular, dir_easy, pairs, blacklist, name_tokens, args.output_format)
+        else:
+            # build dataset as csv file, each row is a pair of documents joined by the pair index
+            rows = pair_rows(pairs, blacklist, r_data, e_data, dir_regular, dir_easy)
+            df = pd.DataFrame(rows, columns=['Regular German', 'Leichte Sprache'])
+            write_table(df, 'EasyGerman{0}'.format(name_tokens), args.output_format)
+            # build small version with 100 samples for testing as csv file
+            df_small = pd.DataFrame(rows[:100], columns=['Regular German', 'Leichte Sprache'])
+            write_table(df_small, 'EasyGerman{0}_small'.format(name_tokens), args.output_format)
+            report.count('dataset_rows', len(rows))
+
+    if store:
+        store.close()
+    report.write(args.report)
+    print('run report written to ' + args.report)
 
 
 if __name__ == '__main__':
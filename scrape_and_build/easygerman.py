@@ -0,0 +1,141 @@
+import os
+import re
+import zlib
+from article_store import ArticleStore, corpus_view
+from manifest import Manifest
+from output_formats import EXTENSIONS, read_table
+from pairs import read_pair_index
+
+# columns of the metadata files read for each document, the raw html and the text are left on disk
+METADATA_COLUMNS = ['Document_Name', 'Title', 'Keywords', 'Url', 'Date', 'Description']
+METADATA_SUFFIX = '_Metadata_EasyGerman'
+# dates of the metadata that are used by the date filters, documents with other dates such as 'None' are undated
+ISO_DATE = re.compile('\\d{4}-\\d{2}-\\d{2}')
+# size of the memory map of the article store
+MMAP_SIZE = 2 ** 30
+
+
+# metadata of every document of all metadata files below a directory written by scrapy.py, by document name
+def read_metadata(directory):
+    metadata = {}
+    for root, dirs, files in os.walk(directory):
+        for file in sorted(files):
+            name, extension = os.path.splitext(file)
+            if name.endswith(METADATA_SUFFIX) and extension in EXTENSIONS.values():
+                table = read_table(os.path.join(root, file), METADATA_COLUMNS).fillna('')
+                for row in table.to_dict('records'):
+                    metadata[row['Document_Name']] = row
+    return metadata
+
+
+# names of the documents removed from the dataset and their pairs, read from a removed_duplicates file of the builder
+def read_removed(path):
+    table = read_table(path, ['Document_Name', 'Pair'])
+    return {name for name in table['Document_Name'].tolist() + table['Pair'].tolist() if isinstance(name, str) and name}
+
+
+# number of word tokens of a text as counted by the builder
+def word_length(text):
+    from nltk import word_tokenize
+    return len(word_tokenize(text))
+
+
+# iso date of a document from its metadata, an empty string if the date is missing or not an iso date
+def document_date(metadata):
+    date = str(metadata.get('Date') or '')[:10]
+    if ISO_DATE.fullmatch(date):
+        return date
+    return ''
+
+
+# shard of a pair, the same for every worker and run because it only depends on the pair id
+def pair_shard(pair, num_shards):
+    url_file, index = pair
+    return zlib.crc32('{0}:{1}'.format(url_file, index).encode('utf-8')) % num_shards
+
+
+# lazy access to the pairs of the dataset for training jobs, the texts are read one pair at a time from the article
+# store or the mdr_articles directories, so a worker only loads the texts of the pairs it iterates over. The metadata
+# of all documents is read once without the raw html, the number of words of each document is taken from the manifest
+# of the builder if it is given. Every worker of a data loader opens its own instance and iterates over its own shard.
+class EasyGermanPairs:
+    def __init__(self, article_store=None, dir_regular=None, dir_easy=None, metadata=None, manifest=None,
+                 removed=None):
+        if not article_store and not (dir_regular and dir_easy):
+            raise ValueError('either an article store or the directories of both languages are needed')
+        self.store = None
+        if article_store:
+            self.store = ArticleStore(article_store, MMAP_SIZE, read_only=True)
+        self.regular = corpus_view(dir_regular, self.store, 'all_regular')
+        self.easy = corpus_view(dir_easy, self.store, 'all_easy')
+        self.pair_index = read_pair_index(self.regular, self.easy)
+        self.metadata = read_metadata(metadata) if metadata else None
+        self.manifest = Manifest(manifest) if manifest else None
+        self.removed = read_removed(removed) if removed else set()
+
+    # words of a document from the manifest, None if it is not known without reading the document
+    def known_length(self, view, filename):
+        if not self.manifest:
+            return None
+        key = view.key(filename, self.manifest)
+        if key is None or key not in self.manifest:
+            return None
+        return self.manifest.get(key)[0]
+
+    # check the date and keywords of a pair against the filters, the date of a pair is the date of its regular document
+    # or, if that is undated, of its Leichte Sprache document. Undated pairs are left out by any date filter.
+    def matches(self, metadata, date_from, date_to, keywords):
+        if self.metadata is None:
+            if date_from or date_to or keywords:
+                raise ValueError('filtering by date or keywords needs the metadata directory')
+            return True
+        date = document_date(metadata['regular']) or document_date(metadata['easy'])
+        if date_from and (not date or date < date_from):
+            return False
+        if date_to and (not date or date > date_to):
+            return False
+        if keywords:
+            pair_keywords = {keyword.strip().lower() for document in [metadata['regular'], metadata['easy']]
+                             for keyword in document.get('Keywords', '').split(',')}
+            if not pair_keywords & {keyword.lower() for keyword in keywords}:
+                return False
+        return True
+
+    # iterate over the (regular, easy, metadata) pairs of a shard of the dataset in a fixed order. Pairs can be filtered
+    # by a date range of iso dates such as '2023-01-01', by keywords of which one has to be among the keywords of the
+    # pair, and by the maximum number of tokens of both documents, counted by the given length function, by default
+    # the number of word tokens.
+    def pairs(self, date_from=None, date_to=None, keywords=None, max_tokens=None, shard=0, num_shards=1,
+              length=word_length):
+        for regular_name, easy_name in self.pair_index.complete_pairs(self.removed):
+            pair = self.pair_index.pair_id(regular_name)
+            if num_shards > 1 and pair_shard(pair, num_shards) != shard:
+                continue
+            metadata = {'pair': pair, 'regular': {}, 'easy': {}}
+            if self.metadata is not None:
+                metadata['regular'] = self.metadata.get(regular_name, {})
+                metadata['easy'] = self.metadata.get(easy_name, {})
+            if not self.matches(metadata, date_from, date_to, keywords):
+                continue
+            lengths = [None, None]
+            if max_tokens and length is word_length:
+                lengths = [self.known_length(self.regular, regular_name), self.known_length(self.easy, easy_name)]
+                if any(words is not None and words > max_tokens for words in lengths):
+                    continue
+            regular = self.regular.read(regular_name)
+            easy = self.easy.read(easy_name)
+            if max_tokens:
+                if lengths[0] is None:
+                    lengths[0] = length(regular)
+                if lengths[1] is None:
+                    lengths[1] = length(easy)
+                if lengths[0] > max_tokens or lengths[1] > max_tokens:
+                    continue
+            yield regular, easy, metadata
+
+    def __iter__(self):
+        return self.pairs()
+
+    def close(self):
+        if self.store:
+            self.store.close()
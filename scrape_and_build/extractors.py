@@ -0,0 +1,150 @@
+import re
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+EXTRACTORS = ['bs4', 'lxml']
+PARAGRAPH_TAGS = ['p', 'h3']
+PARAGRAPH_CLASSES = ['text', 'einleitung', 'subtitle']
+# elements whose text bs4 leaves out of the text of the elements containing them
+NO_TEXT_TAGS = {'script', 'style', 'template'}
+# block elements that close an open paragraph in lxml, like in a browser, while the html parser of bs4 keeps them
+# inside of it
+BLOCK_TAGS = ['address', 'article', 'aside', 'blockquote', 'center', 'details', 'dialog', 'dd', 'dir', 'div', 'dl',
+              'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h4', 'h5', 'h6', 'header',
+              'hgroup', 'hr', 'li', 'listing', 'main', 'menu', 'nav', 'ol', 'pre', 'section', 'summary', 'table', 'ul',
+              'xmp']
+# start and end tags of paragraphs, subheadings and block elements, and the content of the title of a raw page
+PARAGRAPH_TAG = re.compile(b'<(/?)(p|h3|' + '|'.join(BLOCK_TAGS).encode() + b')[\\s/>]', re.IGNORECASE)
+TITLE_CONTENT = re.compile(b'<title[^>]*>(.*?)(?:</title|\\Z)', re.IGNORECASE | re.DOTALL)
+
+
+# raised for pages that the html parsers of bs4 and lxml would read into different paragraphs or titles
+class MalformedPageError(ValueError):
+    pass
+
+
+# check that every paragraph and subheading of a page is closed before the next one or a block element starts and
+# that its title contains no markup. The html parser used by bs4 nests unclosed paragraphs and block elements into
+# paragraphs and parses tags in the title, while lxml closes paragraphs and reads the title as text like a browser
+# does, so such pages are left to the reference extractor.
+def check_well_formed(content):
+    open_tag = None
+    for match in PARAGRAPH_TAG.finditer(content):
+        closing, tag = match.group(1), match.group(2).lower()
+        if tag not in (b'p', b'h3'):
+            if open_tag and not closing:
+                raise MalformedPageError(tag.decode() + ' inside ' + open_tag.decode())
+            continue
+        if closing:
+            if open_tag != tag:
+                raise MalformedPageError('unexpected end tag ' + tag.decode())
+            open_tag = None
+        elif open_tag:
+            raise MalformedPageError(tag.decode() + ' inside ' + open_tag.decode())
+        else:
+            open_tag = tag
+    if open_tag:
+        raise MalformedPageError(open_tag.decode() + ' is not closed')
+    title = TITLE_CONTENT.search(content)
+    if title and b'<' in title.group(1):
+        raise MalformedPageError('markup in the title')
+
+
+# reference extractor, parses the whole page using bs4 and the html parser
+class Bs4Page:
+    def __init__(self, content):
+        self.soup = BeautifulSoup(content, 'html.parser', from_encoding='utf-8')
+
+    def title(self):
+        if self.soup.title:
+            return self.soup.title.string
+        return ''
+
+    # text of all paragraphs and subheadings of the news article
+    def paragraphs(self):
+        return [paragraph.text for paragraph in self.soup.find_all(PARAGRAPH_TAGS, class_=PARAGRAPH_CLASSES)]
+
+    # content of the first meta tag with the given name, fails like bs4 if the tag has no content
+    def meta(self, name):
+        tag = self.soup.find('meta', attrs={"name": name})
+        if tag:
+            return tag['content']
+        return 'None'
+
+
+# fast extractor using the lxml html parser, only the title, paragraph and meta elements are visited and their text
+# is collected the same way bs4 does it
+class LxmlPage:
+    def __init__(self, content):
+        check_well_formed(content)
+        # bs4 is told to decode the page as utf-8, pages that are no valid utf-8 are left to the reference extractor
+        self.root = lxml.html.document_fromstring(content.decode('utf-8'))
+
+    def title(self):
+        title = self.root.find('.//title')
+        if title is None:
+            return ''
+        return element_string(title)
+
+    def paragraphs(self):
+        paragraphs = []
+        for element in self.root.iter(*PARAGRAPH_TAGS):
+            classes = element.get('class')
+            if classes and set(classes.split()).intersection(PARAGRAPH_CLASSES):
+                paragraphs.append(element_text(element))
+        return paragraphs
+
+    def meta(self, name):
+        for element in self.root.iter('meta'):
+            if element.get('name') == name:
+                return element.attrib['content']
+        return 'None'
+
+
+# text of an element and all its descendants without comments, scripts, styles and templates, same as the text
+# attribute of a bs4 tag
+def element_text(element):
+    parts = []
+    collect_text(element, parts)
+    return ''.join(parts)
+
+
+def collect_text(element, parts):
+    if isinstance(element.tag, str) and element.text:
+        parts.append(element.text)
+    for child in element:
+        if child.tag not in NO_TEXT_TAGS:
+            collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+# the single string inside an element or None if there is none, same as the string attribute of a bs4 tag
+def element_string(element):
+    children = list(element)
+    if not children:
+        return element.text or None
+    if len(children) == 1 and not element.text and not children[0].tail and isinstance(children[0].tag, str):
+        return element_string(children[0])
+    return None
+
+
+# parse raw html with the given extractor, pages the fast extractor cannot read or might read differently are parsed
+# by the reference one
+def parse_page(content, extractor='bs4'):
+    if extractor == 'lxml':
+        try:
+            return LxmlPage(content)
+        except (UnicodeDecodeError, ValueError, etree.ParserError):
+            pass
+    return Bs4Page(content)
+
+
+def check_extractor(extractor):
+    if extractor == 'lxml' and lxml is None:
+        raise ImportError('the lxml extractor needs the lxml package to be installed')
@@ -0,0 +1,107 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+# number of recorded urls after which the journal is committed, a crash loses at most these records, whose urls are
+# fetched again by the next run
+COMMIT_INTERVAL = 100
+
+
+# read the urls of a url file the same way download_document does
+def read_urls(filename):
+    with open(filename, 'r') as file:
+        return [line.strip('\n') for line in file.readlines() if line.startswith('http')]
+
+
+# hash of the content of a url file, used to notice when a file was changed after it was downloaded
+def file_hash(filename):
+    with open(filename, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+# persistent journal of all fetched urls and fully downloaded url files, stored in a sqlite database so that an
+# interrupted or repeated crawl only sends requests for urls that were not yet downloaded successfully. The raw
+# content of each url is kept in the html cache under its content hash. Recorded urls are committed in batches and
+# whenever a url file is finished, instead of once per url.
+class FetchJournal:
+    def __init__(self, path, commit_interval=COMMIT_INTERVAL):
+        # the connection is shared by all worker threads of the fetcher, access is serialised by the lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.commit_interval = commit_interval
+        self.uncommitted = 0
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, status TEXT, '
+                                    'http_status INTEGER, etag TEXT, last_modified TEXT, content_hash TEXT, '
+                                    'fetched_at REAL)')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, file_hash TEXT, '
+                                    'finished_at REAL)')
+            self.connection.commit()
+
+    # get the journal entry of a url or None if it was never fetched
+    def lookup(self, url):
+        with self.lock:
+            row = self.connection.execute('SELECT status, http_status, etag, last_modified, content_hash FROM urls '
+                                          'WHERE url = ?', (url,)).fetchone()
+        if not row:
+            return None
+        return {'status': row[0], 'http_status': row[1], 'etag': row[2], 'last_modified': row[3],
+                'content_hash': row[4]}
+
+    # record the response to a url, responses with an error status are kept as failed to be retried next run
+    def record(self, url, http_status, headers, content_hash):
+        status = 'ok' if http_status < 400 else 'failed'
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO urls (url, status, http_status, etag, last_modified, '
+                                    'content_hash, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                    (url, status, http_status, headers.get('ETag'), headers.get('Last-Modified'),
+                                     content_hash, time.time()))
+            self.recorded()
+
+    # record a url that could not be fetched at all, the last successfully fetched content is kept
+    def record_failure(self, url):
+        with self.lock:
+            self.connection.execute('INSERT INTO urls (url, status, fetched_at) VALUES (?, ?, ?) ON CONFLICT(url) '
+                                    'DO UPDATE SET status = excluded.status, fetched_at = excluded.fetched_at',
+                                    (url, 'failed', time.time()))
+            self.recorded()
+
+    # count a recorded url and commit once the batch is full, called with the lock held
+    def recorded(self):
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_interval:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def commit(self):
+        with self.lock:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    # check if a url file was fully downloaded and has not changed since
+    def file_done(self, filename):
+        with self.lock:
+            row = self.connection.execute('SELECT file_hash FROM files WHERE path = ?', (filename,)).fetchone()
+        return bool(row) and row[0] == file_hash(filename)
+
+    # mark a url file as fully downloaded if all of its urls were fetched successfully, the records of its urls are
+    # committed either way
+    def mark_file_done(self, filename):
+        for url in read_urls(filename):
+            entry = self.lookup(url)
+            if not entry or entry['status'] != 'ok':
+                self.commit()
+                return False
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)',
+                                    (filename, file_hash(filename), time.time()))
+            self.connection.commit()
+            self.uncommitted = 0
+        return True
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
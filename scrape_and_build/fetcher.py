@@ -0,0 +1,195 @@
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from html_cache import CacheMissError, content_hash
+from requests.adapters import HTTPAdapter
+from run_report import RunReport
+from urllib.parse import urlsplit
+
+# number of times a request is retried after a connection error or a response with one of the retry statuses, the
+# time between retries doubles starting at the backoff factor in seconds up to the maximum backoff, like in urllib3.
+# A Retry-After of the server is waited for up to its own maximum, so a wrong header cannot stall the scraper.
+RETRIES = 8
+BACKOFF_FACTOR = 2
+BACKOFF_MAX = 120
+RETRY_AFTER_MAX = 300
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# limit the number of requests sent to each host per second, shared by all worker threads
+class HostRateLimiter:
+    def __init__(self, rate):
+        self.interval = 0
+        if rate and rate > 0:
+            self.interval = 1.0 / rate
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    # block until the next request to the host of the given url may be sent
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            # reserve the slot before sleeping so that other threads queue up behind it
+            self.next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+# seconds to wait before a retry, the backoff doubles with every attempt up to the maximum backoff, a longer
+# Retry-After in seconds of the last response is waited for as well, up to its maximum
+def retry_delay(attempt, page=None):
+    delay = min(BACKOFF_FACTOR * 2 ** (attempt - 1), BACKOFF_MAX)
+    if page is not None:
+        retry_after = page.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), RETRY_AFTER_MAX))
+    return delay
+
+
+# http adapter that keeps count of the connections opened and requests sent by its connection pools, including
+# pools that were already discarded by the pool manager
+class CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.discarded_connections = 0
+        self.discarded_requests = 0
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def count_and_dispose(pool):
+            self.discarded_connections += pool.num_connections
+            self.discarded_requests += pool.num_requests
+            if dispose:
+                dispose(pool)
+        pools.dispose_func = count_and_dispose
+
+    # number of connections opened and number of requests sent over all connection pools of this adapter
+    def connection_counts(self):
+        opened = self.discarded_connections
+        requests_sent = self.discarded_requests
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool:
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return opened, requests_sent
+
+
+# download the raw html of mdr news articles, either one after the other or with a bounded pool of worker threads,
+# using one session for the whole crawl so that connections to a host are kept alive and reused. With a journal and
+# a cache, pages are only requested again if they were not fetched successfully before or, with revalidate, if the
+# server reports a change for a conditional request. In offline mode all pages are read from the cache.
+class Fetcher:
+    def __init__(self, workers=1, rate=0, pool_size=10, journal=None, cache=None, revalidate=False, offline=False,
+                 report=None, progress=None):
+        self.workers = max(1, workers)
+        # urls, bytes, retries, http status and errors of all requests are counted in the run report
+        self.report = report or RunReport('fetch')
+        self.progress = progress
+        self.journal = journal
+        self.cache = cache
+        self.revalidate = revalidate
+        self.offline = offline
+        self.rate_limiter = HostRateLimiter(rate)
+        # set session parameters for webscraping, see docu at https://docs.python-requests.org/en/latest/user/advanced/
+        # every worker thread needs its own connection, so the pool is never smaller than the number of workers.
+        # Requests are retried by get instead of the adapter, so that every retry waits for the rate limiter.
+        self.adapter = CountingAdapter(pool_connections=pool_size, pool_maxsize=max(pool_size, self.workers),
+                                       max_retries=0)
+        self.session = requests.Session()
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    # download a single url and count it in the progress
+    def fetch(self, url):
+        content = self.fetch_page(url)
+        if self.progress:
+            self.progress.update()
+        return content
+
+    # send a get request, retrying after connection errors and responses with a retry status. Every attempt waits for
+    # the rate limiter of the host and then for the backoff, or as long as the server asks for with a Retry-After
+    # header, so retries never send requests faster than the given rate.
+    def get(self, url, headers):
+        attempt = 0
+        while True:
+            self.rate_limiter.wait(url)
+            page = None
+            try:
+                page = self.session.get(url, timeout=10, headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == RETRIES:
+                    raise
+            else:
+                if page.status_code not in RETRY_STATUS or attempt == RETRIES:
+                    return page
+            attempt += 1
+            self.report.count('retries')
+            time.sleep(retry_delay(attempt, page))
+
+    # download a single url, urls already fetched successfully in an earlier run are read from the cache instead
+    def fetch_page(self, url):
+        entry = None
+        cached = None
+        if self.journal:
+            entry = self.journal.lookup(url)
+            if entry and entry['content_hash'] and self.cache:
+                cached = self.cache.load(entry['content_hash'])
+        if self.offline:
+            if cached is None:
+                raise CacheMissError(url)
+            self.report.count('cache_hits')
+            return cached
+        headers = {}
+        if cached is not None and entry['status'] == 'ok':
+            if not self.revalidate:
+                self.report.count('cache_hits')
+                return cached
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            page = self.get(url, headers)
+        except requests.exceptions.RequestException as error:
+            self.report.error('fetch', url, error)
+            if self.journal:
+                self.journal.record_failure(url)
+            raise
+        self.report.count('urls_fetched')
+        self.report.count('bytes', len(page.content))
+        self.report.record('http_status', page.status_code)
+        if page.status_code == 304 and headers:
+            return cached
+        if self.journal:
+            if self.cache:
+                key = self.cache.store(page.content)
+            else:
+                key = content_hash(page.content)
+            self.journal.record(url, page.status_code, page.headers, key)
+        return page.content
+
+    # download all given urls and return their content in the same order as the urls
+    def fetch_all(self, urls):
+        if self.workers == 1 or len(urls) < 2:
+            return [self.fetch(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls))) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    # number of connections opened and reused during the crawl
+    def connection_stats(self):
+        opened, requests_sent = self.adapter.connection_counts()
+        return opened, max(0, requests_sent - opened)
+
+    def close(self):
+        self.session.close()
+        if self.journal:
+            self.journal.close()
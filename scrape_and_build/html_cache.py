@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+# fraction of the maximum size the cache is reduced to when it is full
+LOW_WATER = 0.9
+
+
+# raised in offline mode for urls whose raw html is not in the cache
+class CacheMissError(Exception):
+    pass
+
+
+# hash identifying the raw content of a downloaded page
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+# content-addressed cache of raw html responses, compressed on disk and limited in size by evicting the least
+# recently used pages. The time of last use and the size of every page are kept in memory, so the cache directory is
+# only listed once when the cache is opened.
+class HtmlCache:
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.entries = {}
+        self.size = 0
+        for path in self.cached_files():
+            stat = os.stat(path)
+            self.entries[path] = (stat.st_mtime, stat.st_size)
+            self.size += stat.st_size
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.gz')
+
+    def cached_files(self):
+        for root, dirs, files in os.walk(self.directory):
+            for file in files:
+                if file.endswith('.gz'):
+                    yield os.path.join(root, file)
+
+    # mark a page as recently used, on disk for later runs and in the index of this run
+    def use(self, path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # the page was evicted by another thread after it was read
+            return
+        with self.lock:
+            if path in self.entries:
+                self.entries[path] = (time.time(), self.entries[path][1])
+
+    # get the raw content stored under the given hash or None if it is not cached
+    def load(self, key):
+        path = self.path(key)
+        try:
+            with gzip.open(path, 'rb') as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        self.use(path)
+        return content
+
+    # store raw content and return the hash it can be loaded with
+    def store(self, content):
+        key = content_hash(content)
+        path = self.path(key)
+        # compress outside of the lock, so that threads storing different pages only wait for each other's writes
+        compressed = gzip.compress(content)
+        with self.lock:
+            if os.path.exists(path):
+                self.entries.setdefault(path, (time.time(), os.path.getsize(path)))
+                os.utime(path)
+                return key
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first so that an interrupted crawl never leaves a truncated page in the cache
+            temporary_path = path + '.tmp'
+            with open(temporary_path, 'wb') as file:
+                file.write(compressed)
+            os.replace(temporary_path, path)
+            self.entries[path] = (time.time(), len(compressed))
+            self.size += len(compressed)
+            if self.max_size and self.size > self.max_size:
+                self.evict()
+        return key
+
+    # remove the least recently used pages until the cache is below its low-water mark, so that the next pages can be
+    # stored without evicting again, called with the lock held
+    def evict(self):
+        low_water = self.max_size * LOW_WATER
+        for path, (used, size) in sorted(self.entries.items(), key=lambda entry: entry[1][0]):
+            if self.size <= low_water:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self.entries[path]
+            self.size -= size
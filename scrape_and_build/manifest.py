@@ -0,0 +1,79 @@
+import os
+import pickle
+
+
+# manifest of the documents of previous builds. For every document it keeps its text hash and its version, the
+# modification time and size of a file or the text hash of an article in the article store. For every text hash it
+# keeps the number of words, sentences, letters, the vocabulary size, whether the text is empty or an error page and
+# the length in the subword tokens of each tokenizer used, so that a later build neither reads nor tokenizes unchanged
+# documents, only new or changed ones
+class Manifest:
+    def __init__(self, path=None):
+        self.path = path
+        self.files = {}
+        self.metrics = {}
+        self.lengths = {}
+        self.statuses = {}
+        self.seen = set()
+        if path and os.path.exists(path):
+            with open(path, 'rb') as file:
+                entries = pickle.load(file)
+            self.files, self.metrics, self.lengths = entries[:3]
+            # manifests of earlier builds have no statuses, their texts are read once more to add them
+            if len(entries) > 3:
+                self.statuses = entries[3]
+
+    # text hash of a file if its version did not change since it was recorded, otherwise None
+    def lookup(self, path, version):
+        path = os.path.abspath(path)
+        self.seen.add(path)
+        entry = self.files.get(path)
+        if entry and entry[0] == version:
+            return entry[1]
+        return None
+
+    def record(self, path, version, key):
+        path = os.path.abspath(path)
+        self.seen.add(path)
+        self.files[path] = (version, key)
+
+    # whether the metrics and the status of a text are known, so that the text does not need to be read
+    def __contains__(self, key):
+        return key in self.metrics and key in self.statuses
+
+    # get the number of words, sentences, letters and the vocabulary size of a document text
+    def get(self, key):
+        return self.metrics[key]
+
+    def add(self, key, metrics):
+        self.metrics[key] = metrics
+
+    # reason to remove a document text from the dataset found in the text itself, e.g. 'empty', or an empty string
+    def status(self, key):
+        return self.statuses[key]
+
+    def add_status(self, key, status):
+        self.statuses[key] = status
+
+    # length of a document text in the subword tokens of the tokenizer with the given name, None if not yet known
+    def length(self, tokenizer, key):
+        return self.lengths.get((tokenizer, key))
+
+    def add_length(self, tokenizer, key, length):
+        self.lengths[(tokenizer, key)] = length
+
+    # save the entries of all files seen by this build, files that were deleted are dropped together with the metrics
+    # of texts no file refers to anymore
+    def save(self):
+        if not self.path:
+            return
+        files = {path: entry for path, entry in self.files.items() if path in self.seen}
+        keys = {entry[1] for entry in files.values()}
+        metrics = {key: value for key, value in self.metrics.items() if key in keys}
+        lengths = {entry: value for entry, value in self.lengths.items() if entry[1] in keys}
+        statuses = {key: value for key, value in self.statuses.items() if key in keys}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            pickle.dump((files, metrics, lengths, statuses), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,53 @@
+import hashlib
+import numpy as np
+
+# parameters of the minhash signatures, the signature of a document is split into bands of rows and documents that
+# agree on all rows of at least one band are compared
+NUM_PERMUTATIONS = 128
+BANDS = 32
+PRIME = 2 ** 31 - 1
+
+
+# set of overlapping word n-grams of a text
+def shingles(text, size=5):
+    words = text.split()
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+# index of minhash signatures to find documents whose estimated jaccard similarity of word shingles is at least the
+# given threshold, using locality sensitive hashing so that each document is only compared to likely candidates
+class NearDuplicateIndex:
+    def __init__(self, threshold, seed=1):
+        self.threshold = threshold
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+        self.b = generator.randint(0, PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+        self.rows = NUM_PERMUTATIONS // BANDS
+        self.buckets = [{} for _ in range(BANDS)]
+        self.signatures = {}
+
+    def signature(self, text):
+        hashes = np.array([int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+                           % PRIME for shingle in shingles(text)], dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % PRIME).min(axis=0)
+
+    # find an indexed document similar to the given text, returns its name and the estimated similarity or None
+    # and 0, the text is added to the index if no similar document was found
+    def find_or_add(self, name, text):
+        signature = self.signature(text)
+        band_keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(BANDS)]
+        candidates = []
+        for band, band_key in enumerate(band_keys):
+            for candidate in self.buckets[band].get(band_key, []):
+                if candidate not in candidates:
+                    candidates.append(candidate)
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= self.threshold:
+                return candidate, similarity
+        self.signatures[name] = signature
+        for band, band_key in enumerate(band_keys):
+            self.buckets[band].setdefault(band_key, []).append(name)
+        return None, 0
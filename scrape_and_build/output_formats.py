@@ -0,0 +1,83 @@
+import csv
+import pandas as pd
+
+# file formats the dataset and metadata can be written in, csv is the default and the format of the published files,
+# parquet and arrow are compressed columnar formats that let readers load single columns such as Cleaned_text
+# without parsing the raw html
+OUTPUT_FORMATS = ['csv', 'parquet', 'arrow']
+EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+# write a data frame to the given path without extension in the given output format
+def write_table(df, path, output_format='csv'):
+    if output_format == 'parquet':
+        df.to_parquet(path + EXTENSIONS[output_format], compression='zstd', index=False)
+    elif output_format == 'arrow':
+        df.to_feather(path + EXTENSIONS[output_format], compression='zstd')
+    else:
+        df.to_csv(path + EXTENSIONS[output_format], encoding='utf-8', index=False)
+
+
+# read the given columns of a table written by write_table from its path with extension, the columnar formats only read
+# the requested columns from disk
+def read_table(path, columns=None):
+    if path.endswith(EXTENSIONS['parquet']):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith(EXTENSIONS['arrow']):
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+
+
+# write a table row by row in the given output format, rows of the columnar formats are buffered and written in
+# batches
+class TableWriter:
+    def __init__(self, path, columns, output_format='csv', batch_size=1000):
+        self.columns = columns
+        self.output_format = output_format
+        self.batch_size = batch_size
+        self.rows = []
+        self.file = None
+        self.writer = None
+        if output_format == 'csv':
+            self.file = open(path + EXTENSIONS[output_format], 'w', encoding='utf-8', newline='')
+            self.writer = csv.writer(self.file, lineterminator='\n')
+            self.writer.writerow(columns)
+        else:
+            import pyarrow as pa
+            self.schema = pa.schema([(column, pa.string()) for column in columns])
+            if output_format == 'parquet':
+                import pyarrow.parquet as pq
+                self.writer = pq.ParquetWriter(path + EXTENSIONS[output_format], self.schema, compression='zstd')
+            else:
+                self.writer = pa.ipc.new_file(path + EXTENSIONS[output_format], self.schema,
+                                              options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    def write(self, row):
+        if self.output_format == 'csv':
+            self.writer.writerow(row)
+            return
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        import pyarrow as pa
+        batch = pa.RecordBatch.from_arrays([pa.array(column, type=pa.string()) for column in zip(*self.rows)],
+                                           schema=self.schema)
+        self.writer.write_batch(batch)
+        self.rows = []
+
+    def close(self):
+        if self.output_format == 'csv':
+            self.file.close()
+            return
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,71 @@
+import re
+
+# name of a document, the prefix r for regular German or e for Leichte Sprache, the index of the pair in its url file
+# and the name of the url file, e.g. e3_mdr_aug_2021.txt
+DOCUMENT_NAME = re.compile('([re])(\\d+)_(.+)')
+PARTNER_LANGUAGE = {'r': 'e', 'e': 'r'}
+
+
+# pair id and language of a document name, the pair id is the url file name and the index of the pair in it, None for
+# names that are not document names
+def parse_document_name(filename):
+    match = DOCUMENT_NAME.fullmatch(filename)
+    if not match:
+        return None, None
+    return (match.group(3), int(match.group(2))), match.group(1)
+
+
+# sort key of a document name by its pair id, the url file and then the pair index, like the complete pairs of the
+# pair index, with the Leichte Sprache document before the regular one. Names that are not document names come first.
+def document_order(filename):
+    pair, language = parse_document_name(filename)
+    return (pair or ('', -1)) + (filename,)
+
+
+# index of the document pairs of the dataset keyed by pair id, each pair holds the name of its regular and its Leichte
+# Sprache document, so the partner of a document is found with a single lookup
+class PairIndex:
+    def __init__(self, names=()):
+        self.pairs = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, filename):
+        pair, language = parse_document_name(filename)
+        if pair is not None:
+            self.pairs.setdefault(pair, {})[language] = filename
+
+    # name of the other document of the pair of a document, None if the pair has no other document
+    def partner(self, filename):
+        pair, language = parse_document_name(filename)
+        if pair is None:
+            return None
+        return self.pairs.get(pair, {}).get(PARTNER_LANGUAGE[language])
+
+    def pair_id(self, filename):
+        return parse_document_name(filename)[0]
+
+    # names of the documents whose partner is missing, e.g. because its download failed
+    def unpaired(self):
+        return sorted(documents.get('r') or documents.get('e') for documents in self.pairs.values()
+                      if len(documents) == 1)
+
+    # names of the regular and Leichte Sprache document of every complete pair that is not in the blacklist, ordered by
+    # url file and index of the pair so that the order does not depend on the order of directory listings
+    def complete_pairs(self, blacklist=()):
+        for pair in sorted(self.pairs):
+            documents = self.pairs[pair]
+            if len(documents) == 2 and documents['r'] not in blacklist and documents['e'] not in blacklist:
+                yield documents['r'], documents['e']
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+# build the pair index of all documents of the given directories or views of the article store
+def read_pair_index(*directories):
+    pairs = PairIndex()
+    for directory in directories:
+        for filename in directory.names():
+            pairs.add(filename)
+    return pairs
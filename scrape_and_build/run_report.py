@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+# timings, counters, histograms and errors of a run of a script, shared by all threads of the run and written to a json
+# file at the end, so that it can be seen where a run spent its time and why documents were dropped
+class RunReport:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.stages = {}
+        self.counters = Counter()
+        self.histograms = {}
+        self.errors = []
+        self.lock = threading.Lock()
+
+    # time a stage of the run, the time of stages that run several times is added up
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0) + seconds
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    # count a value of a histogram, e.g. the http status of a response
+    def record(self, histogram, value):
+        with self.lock:
+            self.histograms.setdefault(histogram, Counter())[str(value)] += 1
+
+    # record an error with its cause, e.g. the exception that was raised
+    def error(self, kind, subject, cause):
+        with self.lock:
+            self.counters['errors_' + kind] += 1
+            self.errors.append({'kind': kind, 'subject': subject,
+                                'cause': '{0}: {1}'.format(type(cause).__name__, cause)
+                                if isinstance(cause, BaseException) else str(cause)})
+
+    def summary(self):
+        with self.lock:
+            return {
+                'name': self.name,
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'seconds': round(time.time() - self.started, 3),
+                'stages': {stage: round(seconds, 3) for stage, seconds in self.stages.items()},
+                'counters': dict(self.counters),
+                'histograms': {name: dict(histogram) for name, histogram in self.histograms.items()},
+                'errors': list(self.errors),
+            }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+
+# single line progress indicator on stderr, updated at most a few times per second, with the rate and, if the total
+# is known, the remaining time
+class Progress:
+    def __init__(self, description, total=None, interval=0.5, stream=sys.stderr):
+        self.description = description
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.done = 0
+        self.started = time.perf_counter()
+        self.shown = 0
+        self.width = 0
+        self.lock = threading.Lock()
+
+    def update(self, count=1):
+        with self.lock:
+            self.done += count
+            now = time.perf_counter()
+            if now - self.shown >= self.interval or self.done == self.total:
+                self.shown = now
+                self.show(now)
+
+    def show(self, now):
+        seconds = max(now - self.started, 1e-9)
+        rate = self.done / seconds
+        line = '{0}: {1}'.format(self.description, self.done)
+        if self.total:
+            line += '/{0}'.format(self.total)
+        line += ' ({0:.1f}/s'.format(rate)
+        if self.total and rate:
+            line += ', {0:.0f}s left'.format(max(self.total - self.done, 0) / rate)
+        line += ')'
+        # pad the line to overwrite a longer previous line
+        self.stream.write('\r' + line.ljust(self.width))
+        self.width = len(line)
+        self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            self.show(time.perf_counter())
+            self.stream.write('\n')
+            self.stream.flush()
@@ -1,16 +1,62 @@
 import argparse
 import os
 import pandas as pd
-import re
 import requests
-from bs4 import *
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import shutil
+from article_store import ArticleStore
+from cleaning import clean_article
+from extractors import EXTRACTORS, check_extractor, parse_page
+from fetch_journal import FetchJournal
+from fetcher import Fetcher
+from html_cache import CacheMissError, HtmlCache
+from output_formats import OUTPUT_FORMATS, write_table
+from pairs import PairIndex
+from run_report import Progress, RunReport
+
+
+# directories of mdr_articles an article is written to, the directory of its url file and the views of all files and
+# of the files of each language
+ARTICLE_DIRECTORIES = ['./mdr_articles/all_files', './mdr_articles/all_easy', './mdr_articles/all_regular']
+
+
+# create the directory of a url file and the view directories of mdr_articles
+def make_article_directories(name):
+    for directory in ['./mdr_articles/' + name] + ARTICLE_DIRECTORIES:
+        os.makedirs(directory, exist_ok=True)
+
+
+# make a file available under another path as hard link, or as copy if the file system has no hard links
+def link_article(source, target):
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+# write an article once, either into the article store or into the directory of its url file, in which case the
+# directory of all files and the directory of its language get links to the same file instead of copies
+def write_article(article, document_name, name, easy, store=None, period=''):
+    if store:
+        store.add(document_name, article, period)
+        return
+    document_directory = './mdr_articles/' + name + '/' + document_name
+    with open(document_directory, 'w') as d:
+        d.write(article)
+    if easy:
+        # directory containing only easy-to-read / 'leichte sprache' files
+        language_directory = './mdr_articles/all_easy/'
+    else:
+        # directory containing only regular German files
+        language_directory = './mdr_articles/all_regular/'
+    link_article(document_directory, './mdr_articles/all_files/' + document_name)
+    link_article(document_directory, language_directory + document_name)
 
 
 # download and webscrape each news article from a given set of urls which reference mdr news articles read from a
 # text file and also download the article's metadata
-def download_document(filename, name):
+def download_document(filename, name, fetcher, extractor, store=None):
     with open(filename, 'r') as file:
         article_count = 0
         print('Download urls from file {0}'.format(filename))
@@ -19,8 +65,16 @@ def download_document(filename, name):
         lines = file.readlines()
         document_name = ''
         url = ''
-        for url in lines:
-            url = url.strip('\n')
+        # download all pages of the file up front, in parallel if the fetcher has several workers
+        urls = [line.strip('\n') for line in lines if line.startswith('http')]
+        report = fetcher.report
+        with report.stage('fetch'):
+            pages = fetcher.fetch_all(urls)
+        # the period of the articles is the directory of the url file, e.g. mdr_2023
+        period = os.path.basename(os.path.dirname(filename))
+        if not store:
+            make_article_directories(name)
+        for url, content in zip(urls, pages):
             easy = False
             if url.startswith('http'):
                 # set if simpletext or regular, default is regular German
@@ -31,114 +85,51 @@ def download_document(filename, name):
                 # set index of document pair
                 pair_index = int(article_count / 2)
                 prefix_identifier += str(pair_index)
-                # set file name, create or check for directory and set save path
-                file_name = name
-                if not os.path.exists('./mdr_articles'):
-                    os.makedirs('./mdr_articles')
-                save_path = './mdr_articles'
-                directory = "/" + file_name
-                os.makedirs(save_path, exist_ok=True)
-                os.makedirs(save_path + directory, exist_ok=True)
-                document_name = prefix_identifier + '_' + file_name + '.txt'
-                # set session parameters for webscraping, see docu
-                # at https://docs.python-requests.org/en/latest/user/advanced/
-                session = requests.Session()
-                retry = Retry(total=8, backoff_factor=2)
-                adapter = HTTPAdapter(max_retries=retry)
-                session.mount('https://', adapter)
-                page = session.get(url, timeout=10)
-                content = page.content
-                # get text elements using bs4, parse using the html parser and filter for all paragraphs and subheadings
-                le_soup = BeautifulSoup(content, 'html.parser', from_encoding='utf-8')
-                title = ''
-                if le_soup.title:
-                    title = le_soup.title.string
-                paragraphs = le_soup.find_all(['p', 'h3'], class_=["text", "einleitung", "subtitle"])
-
-                # scrape raw text to get mdr news article
-                text = ''
-                p = 0
-                size = len(paragraphs)
-                for paragraph in paragraphs:
-                    # write each paragraph to the buffer
-                    p += 1
-                    p_text = paragraph.text
-                    if p == size:
-                        # check if last line contains credits without meaning, if so disregard the line
-                        lastline = re.findall('(MDR)|(dpa)', p_text)
-                        if lastline:
-                            continue
-                    text += p_text + '\n'
-                # clean text by removing redundant linebreaks and characters that cannot be as utf-8
-                text = re.sub('(\n){3,}', '\n\n', text)
-                text = re.sub('([^a-zA-ZÄÜÖäüößéí\d:!?\.\,\- \"\'\\n•])', ' ', text)
-                text = re.sub(r'([.!?:])([A-Z])', r'\1 \2', text)
-                text.encode('utf-8')
+                # set file name
+                document_name = prefix_identifier + '_' + name + '.txt'
+                # get text elements using the chosen extractor and filter for all paragraphs and subheadings
+                with report.stage('parse'):
+                    page = parse_page(content, extractor)
+                    title = page.title()
+                    paragraphs = page.paragraphs()
+
+                # join the paragraphs to get the mdr news article without credits and clean its text
+                with report.stage('clean'):
+                    text = clean_article(paragraphs)
 
                 try:
                     # download metadata
-                    metadata = download_metadata(le_soup, document_name, title, content, text, url, article_count, metadata)
-                except:
-                    # don't crash if metadata unavailable
+                    metadata = download_metadata(page, document_name, title, content, text, url, article_count, metadata)
+                except Exception as error:
+                    # don't crash if metadata unavailable, but keep the cause in the run report
+                    report.error('metadata', document_name + ':  ' + url, error)
                     return [], document_name + ':  ' + url
 
-                document_directory = save_path + directory + '/' + document_name
-                if not os.path.exists('./mdr_articles/all_files/'):
-                    os.makedirs('./mdr_articles/all_files/')
-                if not os.path.exists('./mdr_articles/all_easy/'):
-                    os.makedirs('./mdr_articles/all_easy/')
-                if not os.path.exists('./mdr_articles/all_regular/'):
-                    os.makedirs('./mdr_articles/all_regular/')
-                document_all_files = './mdr_articles/all_files/' + document_name
-                document_easy_files = './mdr_articles/all_easy/' + document_name
-                document_regular_files = './mdr_articles/all_regular/' + document_name
-
-                # write data to all files and individual directories needed to build and assess the dataset
-                with open(document_directory, 'w') as d:
-                    d.write(title + '\n\n' + text)
-                    print(document_name + ':  ' + url)
-                # write to directory containing all files
-                with open(document_all_files, 'w') as d:
-                    d.write(title + '\n\n' + text)
-                if easy:
-                    # write to directory containing only easy-to-read / 'leichte sprache' files
-                    with open(document_easy_files, 'w') as d:
-                        d.write(title + '\n\n' + text)
-                else:
-                    # write to directory containing only regular German files
-                    with open(document_regular_files, 'w') as d:
-                        d.write(title + '\n\n' + text)
+                # write data once to the article store or the directories needed to build and assess the dataset
+                report.count('articles_written')
+                with report.stage('write_articles'):
+                    write_article(title + '\n\n' + text, document_name, name, easy, store, period)
+                print(document_name + ':  ' + url)
                 article_count += 1
 
         return metadata, document_name + ':  ' + url
 
 
-# get all metadata of one document from parsed html soup to later write to metadata file
-def download_metadata(le_soup, document_name, title, content, text, url, count, metadata):
+# get all metadata of one document from the parsed html page to later write to metadata file
+def download_metadata(page, document_name, title, content, text, url, count, metadata):
     # download metadata
-    date = le_soup.find('meta', attrs={"name": "date"})
-    if date:
-        date = date['content']
-    else:
-        date = 'None'
-    description = le_soup.find('meta', attrs={"name": "description"})
-    if description:
-        description = description['content']
-    else:
-        description = 'None'
-    keywords = le_soup.find('meta', attrs={"name": "keywords"})
-    if keywords:
-        keywords = keywords['content']
-    else:
-        keywords = 'None'
+    date = page.meta('date')
+    description = page.meta('description')
+    keywords = page.meta('keywords')
     metadata.update({count: {'document_name': document_name, 'title': title, 'description': description,
                              'url': url, 'date': date, 'keywords': keywords, 'data': title + '\n\n' + text,
                              'raw_html': content}})
     return metadata
 
 
-# write metadata gained from all documents to separate files at designated location
-def write_metadata(metadata, path, file):
+# write metadata gained from all documents to separate files at designated location, in the columnar formats the
+# raw html is kept as bytes in its own column so that readers can load the other columns without it
+def write_metadata(metadata, path, file, output_format='csv'):
     document_name = []
     title = []
     description = []
@@ -148,6 +139,8 @@ def write_metadata(metadata, path, file):
     cleaned_text = []
     raw_html = []
     relation = []
+    documents = {meta['document_name']: meta for meta in metadata.values()}
+    pairs = PairIndex(documents)
 
     # determine relation between easy german and regular german samples
     for i in range(len(metadata.keys())):
@@ -162,16 +155,14 @@ def write_metadata(metadata, path, file):
         cleaned_text.append(meta['data'])
         raw_html.append(meta['raw_html'])
 
-        # if sample is in leichte sprache, check sample index-wise before which is pairwise sample in regular language
-        if i % 2 == 1:
-            meta_relation = metadata[i - 1]
-        # if sample is in regular German, check sample index-wise after which is pairwise sample in leichte sprache
+        # look up the pairwise sample in the other language by the pair id, a sample whose pair is missing has no
+        # relation
+        partner = pairs.partner(meta['document_name'])
+        if partner:
+            meta_relation = documents[partner]
+            relation.append(meta_relation['document_name'] + '; ' + meta_relation['title'])
         else:
-            meta_relation = metadata[i + 1]
-
-        relation_name = meta_relation['document_name']
-        relation_title = meta_relation['title']
-        relation.append(relation_name + '; ' + relation_title)
+            relation.append('')
 
     df = pd.DataFrame()
     df['Document_Name'] = document_name
@@ -185,17 +176,33 @@ def write_metadata(metadata, path, file):
     df['Relation'] = relation
     df.columns = ['Document_Name', 'Title', 'Keywords', 'Url', 'Date',
                   'Description', 'Cleaned_text', 'Raw_html', 'Relation']
-    # write metadata to csv
-    df.to_csv(path + '/{0}_Metadata_EasyGerman.csv'.format(file), encoding='utf-8', index=False)
+    # write metadata to csv or a columnar format
+    write_table(df, path + '/{0}_Metadata_EasyGerman'.format(file), output_format)
 
 
-def download_single_file(file, path, errorlog):
+def download_single_file(file, path, errorlog, fetcher, extractor, output_format, store=None):
     filename = str(file.split('.txt')[0])
     document_name = ''
+    # skip url files that were fully downloaded by an earlier run, unless they are rebuilt from the cache
+    if not fetcher.offline and fetcher.journal and fetcher.journal.file_done(path + '/' + file):
+        print('{0} was already downloaded'.format(filename))
+        fetcher.report.count('files_skipped')
+        return
     print('\n------------------------------------------------------------------------\n')
     print(filename)
     print('\n------------------------------------------------------------------------\n')
-    metadata, document_name = download_document(path + '/' + file, filename)
+    try:
+        metadata, document_name = download_document(path + '/' + file, filename, fetcher, extractor, store)
+    except CacheMissError as error:
+        # in offline mode a file can only be rebuilt if all of its pages are cached
+        print('{0} is not in the html cache'.format(error))
+        fetcher.report.error('cache_miss', path + '/' + file, error)
+        metadata = []
+    except requests.exceptions.RequestException:
+        # the cause is already in the run report, the file is written to the error log below
+        metadata = []
+    if store:
+        store.commit()
     if not metadata:
         print('\n-------------------------------------\n')
         print(
@@ -203,12 +210,22 @@ def download_single_file(file, path, errorlog):
         print('\n-------------------------------------\n')
         errorlog.write(
             '\n {0}:  {1}\n'.format(path.split('/')[len(path.split('/'))-1], filename))
+        fetcher.report.count('files_failed')
+        if fetcher.journal:
+            # keep the urls of the file that were fetched, so the next run only retries the failed ones
+            fetcher.journal.commit()
     else:
-        write_metadata(metadata, './metadata' + '/' + path, filename)
+        with fetcher.report.stage('write_metadata'):
+            write_metadata(metadata, './metadata' + '/' + path, filename, output_format)
+        # with a journal a file is only done if all of its urls were fetched, otherwise it is retried by the next run
+        if not fetcher.journal or fetcher.journal.mark_file_done(path + '/' + file):
+            fetcher.report.count('files_done')
+        else:
+            fetcher.report.count('files_incomplete')
 
 
 # recursively download news article files from input
-def webscrape_rec(input, path, errorlog):
+def webscrape_rec(input, path, errorlog, fetcher, extractor, output_format, store=None):
     # if input is a single directory
     if input == path:
         if os.path.isdir(path):
@@ -216,10 +233,10 @@ def webscrape_rec(input, path, errorlog):
                 os.makedirs('./metadata' + '/' + path)
             files = os.listdir(path)
             for file in files:
-                webscrape_rec(file, path, errorlog)
+                webscrape_rec(file, path, errorlog, fetcher, extractor, output_format, store)
         # if input is a file not directory then webscrape its urls
         else:
-            download_single_file(input, path, errorlog)
+            download_single_file(input, path, errorlog, fetcher, extractor, output_format, store)
     # if input is a nested nested directory
     else:
         if os.path.isdir(path + '/' + input):
@@ -227,10 +244,10 @@ def webscrape_rec(input, path, errorlog):
                 os.makedirs('./metadata' + '/' + path + '/' + input)
             files = os.listdir(path + '/' + input)
             for file in files:
-                webscrape_rec(file, path + '/' + input, errorlog)
+                webscrape_rec(file, path + '/' + input, errorlog, fetcher, extractor, output_format, store)
         # if input is a file not directory then webscrape its urls
         else:
-            download_single_file(input, path, errorlog)
+            download_single_file(input, path, errorlog, fetcher, extractor, output_format, store)
 
 
 # script to download a urls referencing pairs of german news websites in regular and easy language / 'leichte Sprache'
@@ -238,17 +255,71 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('input', type=str, nargs='?',
                         help='single directory, nested directory or single text file containing urls to be downloaded to later build the EasyGerman dataset')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of articles downloaded in parallel, default downloads one article after the other')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='maximum number of requests per second sent to a single host, 0 disables the limit')
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help='number of connections per host kept alive and reused during the crawl')
+    parser.add_argument('--journal', type=str, default='./metadata/fetch_journal.db',
+                        help='fetch journal used to resume the crawl and skip urls that were already downloaded')
+    parser.add_argument('--no-journal', action='store_true',
+                        help='download all urls again without reading or writing the fetch journal or html cache')
+    parser.add_argument('--cache', type=str, default='./metadata/html_cache',
+                        help='directory of the compressed cache of raw html pages')
+    parser.add_argument('--cache-size', type=int, default=2048,
+                        help='maximum size of the html cache in megabytes, least recently used pages are removed first')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='send conditional requests for cached pages and only download them again if they changed')
+    parser.add_argument('--offline', action='store_true',
+                        help='rebuild mdr_articles and the metadata files from the html cache without network access')
+    parser.add_argument('--extractor', type=str, default='bs4', choices=EXTRACTORS,
+                        help='html extractor, bs4 is the reference and lxml a faster extractor with the same output')
+    parser.add_argument('--output-format', type=str, default='csv', choices=OUTPUT_FORMATS,
+                        help='file format of the metadata files, parquet and arrow are compressed columnar formats')
+    parser.add_argument('--report', type=str, default='./metadata/run_report.json',
+                        help='json file the timings, counters and errors of the run are written to')
+    parser.add_argument('--article-store', type=str, default=None,
+                        help='write each article once into this sqlite article store instead of the mdr_articles directories')
     args = parser.parse_args()
     input = args.input
+    check_extractor(args.extractor)
+    if args.offline and args.no_journal:
+        parser.error('--offline needs the fetch journal to find the cached pages')
 
     # make folder to write metadata into
     if not os.path.exists('./metadata'):
         os.makedirs('./metadata')
 
+    journal = None
+    cache = None
+    if not args.no_journal:
+        journal = FetchJournal(args.journal)
+        cache = HtmlCache(args.cache, args.cache_size * 1024 * 1024)
+    store = None
+    if args.article_store:
+        store = ArticleStore(args.article_store)
+    report = RunReport('scrapy')
+    progress = Progress('pages')
+    fetcher = Fetcher(args.workers, args.rate, args.pool_size, journal, cache, args.revalidate, args.offline, report,
+                      progress)
+
     # download all given urls in folder or file given as input
     with open('./metadata/errorlog.txt', 'w') as errorlog:
         errorlog.write('Error log of Metatdata Download for EasyGerman Dataset\n\nthe following files could not be fully downloaded:\n')
-        webscrape_rec(input, input, errorlog)
+        webscrape_rec(input, input, errorlog, fetcher, args.extractor, args.output_format, store)
+    fetcher.close()
+    if store:
+        store.close()
+    progress.close()
+
+    opened, reused = fetcher.connection_stats()
+    print('\nconnections opened: ' + str(opened))
+    print('connections reused: ' + str(reused))
+    report.count('connections_opened', opened)
+    report.count('connections_reused', reused)
+    report.write(args.report)
+    print('run report written to ' + args.report)
 
 
 if __name__ == '__main__':
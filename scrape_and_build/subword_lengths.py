@@ -0,0 +1,34 @@
+import hashlib
+import os
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+
+# length of documents in the subword tokens of a model, using a fast tokenizer loaded from a local tokenizer.json file
+# or a directory containing one, so that nothing is downloaded. Texts are encoded in batches.
+class SubwordTokenizer:
+    def __init__(self, path, batch_size=256):
+        if Tokenizer is None:
+            raise ImportError('the length filter by subword tokens needs the tokenizers package to be installed')
+        if os.path.isdir(path):
+            path = os.path.join(path, 'tokenizer.json')
+        self.tokenizer = Tokenizer.from_file(path)
+        # a tokenizer.json can enable padding or truncation, either would hide the real length of a text
+        self.tokenizer.no_padding()
+        self.tokenizer.no_truncation()
+        self.batch_size = batch_size
+        # identifies the tokenizer in the cached lengths, a different tokenizer file gives different lengths
+        with open(path, 'rb') as file:
+            self.name = hashlib.sha1(file.read()).hexdigest()
+
+    # number of tokens of each text, counting the special tokens the tokenizer adds, such as [CLS] and [SEP], because
+    # they count towards the maximum input length of the model as well
+    def lengths(self, texts):
+        lengths = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + self.batch_size])
+            lengths.extend(len(encoding.ids) for encoding in encodings)
+        return lengths
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import pytest
+from article_store import ArticleStore, DirectoryView, StoreView, corpus_view
+from manifest import Manifest
+from token_cache import text_hash
+
+ARTICLES = {
+    'r0_mdr_test_2023.txt': 'Ein Text in normaler Sprache.\n',
+    'e0_mdr_test_2023.txt': 'Ein Text in Leichter Sprache.\n',
+    'r1_mdr_test_2023.txt': 'Noch ein Text.\n',
+    'r10_mdr_test_2023.txt': 'Der zehnte Text.\n',
+    'r0_mdr_other_2024.txt': 'Ein Text aus einer anderen Datei.\n',
+}
+
+
+def write_store(path):
+    store = ArticleStore(path)
+    for name, text in ARTICLES.items():
+        store.add(name, text, 'mdr_2023')
+    store.close()
+
+
+def test_views_of_the_store(tmp_path):
+    path = str(tmp_path / 'articles.sqlite')
+    write_store(path)
+    store = ArticleStore(path, read_only=True)
+    # the views are ordered by pair id, the url file and then the pair index
+    assert store.names() == ['r0_mdr_other_2024.txt', 'e0_mdr_test_2023.txt', 'r0_mdr_test_2023.txt',
+                             'r1_mdr_test_2023.txt', 'r10_mdr_test_2023.txt']
+    assert store.names('all_easy') == ['e0_mdr_test_2023.txt']
+    assert store.names('all_regular') == ['r0_mdr_other_2024.txt', 'r0_mdr_test_2023.txt', 'r1_mdr_test_2023.txt',
+                                          'r10_mdr_test_2023.txt']
+    assert store.names('mdr_test_2023') == ['e0_mdr_test_2023.txt', 'r0_mdr_test_2023.txt', 'r1_mdr_test_2023.txt',
+                                            'r10_mdr_test_2023.txt']
+    assert [name for name, text, key in store.articles()] == [name for name, key in store.hashes()] == store.names()
+    assert store.text('r1_mdr_test_2023.txt') == ARTICLES['r1_mdr_test_2023.txt']
+    assert store.text_hash('r1_mdr_test_2023.txt') == text_hash(ARTICLES['r1_mdr_test_2023.txt'])
+    with pytest.raises(KeyError):
+        store.text('r9_mdr_test_2023.txt')
+    store.close()
+
+
+def test_read_only_store_is_neither_created_nor_changed(tmp_path):
+    path = str(tmp_path / 'missing' / 'articles.sqlite')
+    with pytest.raises(FileNotFoundError):
+        ArticleStore(path, read_only=True)
+    assert not os.path.exists(os.path.dirname(path))
+    path = str(tmp_path / 'articles.sqlite')
+    write_store(path)
+    store = ArticleStore(path, read_only=True)
+    with pytest.raises(sqlite3.OperationalError):
+        store.add('r2_mdr_test_2023.txt', 'Ein neuer Text.\n')
+    store.close()
+
+
+def test_store_and_directory_views_read_the_same_documents(tmp_path):
+    path = str(tmp_path / 'articles.sqlite')
+    write_store(path)
+    directory = tmp_path / 'all_files'
+    directory.mkdir()
+    for name, text in ARTICLES.items():
+        (directory / name).write_text(text)
+    store = ArticleStore(path, read_only=True)
+    store_view = corpus_view(str(directory), store, 'all_files')
+    directory_view = corpus_view(str(directory))
+    assert isinstance(store_view, StoreView) and isinstance(directory_view, DirectoryView)
+    assert sorted(store_view.texts()) == sorted(directory_view.texts()) == sorted(ARTICLES.items())
+    assert store_view.names() == directory_view.names()
+    store.close()
+
+
+def test_unchanged_documents_are_not_read_again(tmp_path):
+    directory = tmp_path / 'all_files'
+    directory.mkdir()
+    for name, text in ARTICLES.items():
+        (directory / name).write_text(text)
+    view = DirectoryView(str(directory))
+    manifest = Manifest()
+    documents = sorted(view.documents(manifest))
+    assert documents == sorted((name, text, text_hash(text)) for name, text in ARTICLES.items())
+    for name, text, key in documents:
+        manifest.add(key, (0, 0, 0, 0))
+        manifest.add_status(key, '')
+    (directory / 'r1_mdr_test_2023.txt').write_text('Ein geänderter Text.\n')
+    documents = dict((name, (text, key)) for name, text, key in view.documents(manifest))
+    assert documents['r0_mdr_test_2023.txt'] == (None, text_hash(ARTICLES['r0_mdr_test_2023.txt']))
+    assert documents['r1_mdr_test_2023.txt'] == ('Ein geänderter Text.\n', text_hash('Ein geänderter Text.\n'))
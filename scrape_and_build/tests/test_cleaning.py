@@ -0,0 +1,37 @@
+import random
+import pytest
+
+pytest.importorskip('bs4')
+from benchmark_cleaning import reference_clean_article  # noqa: E402
+from cleaning import clean_article  # noqa: E402
+
+# pieces of paragraphs covering every case of the cleaning: credits, linebreaks, characters that are replaced and
+# punctuation followed by the start of the next sentence
+PIECES = ['Das', 'ist', 'ein', 'Satz', 'Ärger', 'größer', 'café', 'Año', '2023', ' ', '  ', '.', '!', '?', ':', ',',
+          '-', '"', "'", '•', '\n', '\n\n', '\n\n\n', '\n\n\n\n\n', '„', '“', '–', '€', '&', '(', ')', '\t', '­',
+          '😀', 'MDR', 'dpa', 'Quelle', '.Neu', '!Auch', ':Ja', '?B', '.ä', '.1']
+
+
+def random_paragraphs(generator):
+    return [''.join(generator.choice(PIECES) for _ in range(generator.randint(0, 30)))
+            for _ in range(generator.randint(0, 6))]
+
+
+@pytest.mark.parametrize('paragraphs', [
+    [],
+    [''],
+    ['Quelle: MDR, dpa'],
+    ['Ein Satz.Noch ein Satz!Und noch einer?Ja:Nein', 'Quelle: MDR'],
+    ['MDR berichtet über die Wahl.', 'Das Ende.'],
+    ['Erster Absatz\n\n\n\nZweiter Absatz', '„Zitat“ – mit 5 € (ungefähr)'],
+    ['Zeile\n', '\n', '\n', 'dpa'],
+])
+def test_clean_article_matches_reference(paragraphs):
+    assert clean_article(paragraphs) == reference_clean_article(paragraphs)
+
+
+def test_clean_article_matches_reference_on_random_paragraphs():
+    generator = random.Random(1)
+    for _ in range(2000):
+        paragraphs = random_paragraphs(generator)
+        assert clean_article(paragraphs) == reference_clean_article(paragraphs), paragraphs
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip('pandas')
+from corpus_statistics import CorpusStatistics  # noqa: E402
+
+
+def test_period_with_one_empty_document():
+    statistics = CorpusStatistics({'mdr_test_2023': 'mdr_2023', 'mdr_test_2024': 'mdr_2024'})
+    statistics.add('r0_mdr_test_2023.txt', 40, 10, 2, 8)
+    statistics.add('r1_mdr_test_2023.txt', 20, 5, 1, 5)
+    statistics.add('r0_mdr_test_2024.txt', 0, 0, 0, 0)
+    summary = statistics.summaries(12, {'mdr_2023': 12, 'mdr_2024': 0})
+    assert summary['files'] == 3
+    assert summary['letters_per_word'] == 4
+    assert summary['words_per_sentence'] == 5
+    assert summary['max_words'] == 10
+    empty = summary['periods']['mdr_2024']
+    assert empty['files'] == 1
+    assert empty['letters_per_word'] == 0
+    assert empty['words_per_sentence'] == 0
+    assert empty['words_per_file'] == 0
+    assert empty['max_words'] == 0
+    assert empty['median']['words'] == 0
+
+
+def test_no_documents():
+    summary = CorpusStatistics().summaries(0, {})
+    assert summary['files'] == 0
+    assert summary['words_per_file'] == 0
+    assert summary['percentiles']['words']['p90'] == 0
+    assert summary['periods'] == {}
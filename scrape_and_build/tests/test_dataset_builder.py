@@ -0,0 +1,104 @@
+import json
+import os
+import random
+import sys
+import pytest
+
+nltk = pytest.importorskip('nltk')
+pytest.importorskip('hvplot')
+pytest.importorskip('scipy')
+try:
+    nltk.word_tokenize('Ein Satz. Noch ein Satz.')
+    nltk.corpus.stopwords.words('german')
+except LookupError:
+    pytest.skip('the nltk punkt tokenizer and stop words are not installed', allow_module_level=True)
+import dataset_builder  # noqa: E402
+from article_store import ArticleStore  # noqa: E402
+
+WORDS = ['Haus', 'Hund', 'Katze', 'und', 'der', 'die', 'Stadt', 'Wetter', 'heute', 'morgen', 'Regen', 'Sonne',
+         'Leipzig', 'Schule', 'fahren', 'gehen', 'ist', 'neu']
+MAX_TOKENS = '40'
+# files written by a build that have to be the same for every way of building the dataset
+OUTPUTS = ['EasyGerman_40.csv', 'EasyGerman_40_small.csv', 'removed_duplicates_40.csv',
+           os.path.join('statistics', 'statistics_easyGerman_40.json')]
+
+
+def make_text(generator, easy):
+    sentences = []
+    for _ in range(generator.randint(1, 4 if easy else 6)):
+        words = [generator.choice(WORDS) for _ in range(generator.randint(3, 6 if easy else 10))]
+        sentences.append(words[0].capitalize() + ' ' + ' '.join(words[1:]) + '. ')
+    return ''.join(sentences) + '\n'
+
+
+# fixture corpus in the layout of mdr_articles, with an empty pair, an error page, a duplicate pair, a document
+# without its pair and documents that are too long, and the url files of two periods
+def write_corpus(directory):
+    generator = random.Random(1)
+    articles = {}
+    for url_file in ['mdr_test_2022', 'mdr_test_2023']:
+        for index in range(12):
+            for language in 're':
+                name = '{0}{1}_{2}.txt'.format(language, index, url_file)
+                if index == 3:
+                    articles[name] = '\n\n'
+                elif index == 5 and language == 'r':
+                    articles[name] = 'Seite nicht gefunden. \n'
+                elif index == 7:
+                    articles[name] = articles['{0}1_{1}.txt'.format(language, url_file)]
+                elif index == 9 and language == 'e':
+                    continue
+                else:
+                    articles[name] = make_text(generator, language == 'e')
+        (directory / 'mdr_urls' / url_file[-4:]).mkdir(parents=True)
+        (directory / 'mdr_urls' / url_file[-4:] / (url_file + '.txt')).write_text('')
+    for name, text in articles.items():
+        for subset in ['all_files', 'all_regular' if name.startswith('r') else 'all_easy']:
+            (directory / 'mdr_articles' / subset).mkdir(parents=True, exist_ok=True)
+            (directory / 'mdr_articles' / subset / name).write_text(text)
+    return articles
+
+
+# run the builder in its own output directory and return the content of the files it wrote
+def build(directory, corpus, monkeypatch, *options):
+    directory.mkdir(exist_ok=True)
+    monkeypatch.chdir(directory)
+    # the plots need a browser to be exported and are not part of the comparison
+    monkeypatch.setattr(dataset_builder, 'plot_word_freq', lambda *args: None)
+    articles = corpus / 'mdr_articles'
+    monkeypatch.setattr(sys, 'argv', ['dataset_builder.py', MAX_TOKENS, str(articles / 'all_files'),
+                                      str(articles / 'all_regular'), str(articles / 'all_easy'),
+                                      '--periods', str(corpus / 'mdr_urls')] + list(options))
+    dataset_builder.main()
+    outputs = {}
+    for output in OUTPUTS:
+        with open(directory / output, encoding='utf-8') as file:
+            outputs[output] = file.read()
+    return outputs
+
+
+def test_serial_parallel_and_streaming_builds_are_the_same(tmp_path, monkeypatch):
+    write_corpus(tmp_path)
+    serial = build(tmp_path / 'serial', tmp_path, monkeypatch)
+    assert build(tmp_path / 'jobs', tmp_path, monkeypatch, '--jobs', '2') == serial
+    assert build(tmp_path / 'streaming', tmp_path, monkeypatch, '--streaming') == serial
+    removed = serial['removed_duplicates_40.csv']
+    for reason in ['empty', 'page not found', 'duplicate', 'missing pair']:
+        assert ',' + reason + ',' in removed
+    assert serial['EasyGerman_40.csv'].count('\n') > 1
+    with open(tmp_path / 'serial' / 'statistics' / 'run_report.json') as file:
+        assert 'get_vocab' in json.load(file)['stages']
+
+
+def test_incremental_build_and_article_store_are_the_same(tmp_path, monkeypatch):
+    articles = write_corpus(tmp_path)
+    serial = build(tmp_path / 'serial', tmp_path, monkeypatch)
+    manifest = str(tmp_path / 'manifest.pkl')
+    assert build(tmp_path / 'first', tmp_path, monkeypatch, '--manifest', manifest) == serial
+    assert build(tmp_path / 'second', tmp_path, monkeypatch, '--manifest', manifest) == serial
+    store = ArticleStore(str(tmp_path / 'articles.sqlite'))
+    for name, text in articles.items():
+        store.add(name, text)
+    store.close()
+    assert build(tmp_path / 'store', tmp_path, monkeypatch, '--article-store', str(tmp_path / 'articles.sqlite')) == \
+        serial
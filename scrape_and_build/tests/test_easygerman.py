@@ -0,0 +1,92 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+from article_store import ArticleStore  # noqa: E402
+from easygerman import METADATA_COLUMNS, EasyGermanPairs, pair_shard  # noqa: E402
+
+DOCUMENTS = {
+    'r0_mdr_test_2023.txt': 'Ein Text in normaler Sprache.',
+    'e0_mdr_test_2023.txt': 'Ein Text in Leichter Sprache.',
+    'r1_mdr_test_2023.txt': 'Noch ein Text in normaler Sprache.',
+    'e1_mdr_test_2023.txt': 'Noch ein Text in Leichter Sprache.',
+}
+METADATA = [
+    {'Document_Name': 'r0_mdr_test_2023.txt', 'Keywords': 'wetter', 'Date': '2023-10-02T08:00:00'},
+    {'Document_Name': 'e0_mdr_test_2023.txt', 'Keywords': 'wetter', 'Date': '2023-10-02'},
+    {'Document_Name': 'r1_mdr_test_2023.txt', 'Keywords': 'sport', 'Date': 'None'},
+    {'Document_Name': 'e1_mdr_test_2023.txt', 'Keywords': 'sport', 'Date': 'None'},
+]
+
+
+# directories of both languages and a metadata directory in the layout written by scrapy.py
+def write_corpus(directory):
+    for language in ['regular', 'easy']:
+        (directory / ('all_' + language)).mkdir()
+    for name, text in DOCUMENTS.items():
+        language = 'regular' if name.startswith('r') else 'easy'
+        (directory / ('all_' + language) / name).write_text(text)
+    (directory / 'metadata').mkdir()
+    metadata = pd.DataFrame(METADATA, columns=METADATA_COLUMNS)
+    metadata.to_csv(directory / 'metadata' / 'mdr_test_2023_Metadata_EasyGerman.csv', index=False)
+
+
+# directory of both languages of the corpus without metadata
+def directory_pairs(directory, **options):
+    write_corpus(directory)
+    return EasyGermanPairs(dir_regular=str(directory / 'all_regular'), dir_easy=str(directory / 'all_easy'), **options)
+
+
+def test_store_and_directories_give_the_same_pairs(tmp_path):
+    path = str(tmp_path / 'articles.sqlite')
+    store = ArticleStore(path)
+    for name, text in DOCUMENTS.items():
+        store.add(name, text)
+    store.close()
+    from_store = EasyGermanPairs(article_store=path)
+    from_directories = directory_pairs(tmp_path)
+    assert list(from_store) == list(from_directories) == [
+        (DOCUMENTS['r0_mdr_test_2023.txt'], DOCUMENTS['e0_mdr_test_2023.txt'],
+         {'pair': ('mdr_test_2023.txt', 0), 'regular': {}, 'easy': {}}),
+        (DOCUMENTS['r1_mdr_test_2023.txt'], DOCUMENTS['e1_mdr_test_2023.txt'],
+         {'pair': ('mdr_test_2023.txt', 1), 'regular': {}, 'easy': {}})]
+    from_store.close()
+    with pytest.raises(FileNotFoundError):
+        EasyGermanPairs(article_store=str(tmp_path / 'missing.sqlite'))
+
+
+def test_shards_split_the_pairs(tmp_path):
+    pairs = directory_pairs(tmp_path)
+    shards = [[metadata['pair'] for regular, easy, metadata in pairs.pairs(shard=shard, num_shards=3)]
+              for shard in range(3)]
+    assert sorted(pair for shard in shards for pair in shard) == [('mdr_test_2023.txt', 0), ('mdr_test_2023.txt', 1)]
+    for shard, shard_pairs in enumerate(shards):
+        assert all(pair_shard(pair, 3) == shard for pair in shard_pairs)
+
+
+def test_filter_by_length_and_removed_documents(tmp_path):
+    removed = tmp_path / 'removed_duplicates_1024.csv'
+    removed_documents = [{'Document_Name': 'e1_mdr_test_2023.txt', 'Pair': 'r1_mdr_test_2023.txt'}]
+    pd.DataFrame(removed_documents).to_csv(removed, index=False)
+    pairs = directory_pairs(tmp_path)
+    # the length function is given the text of each document, every document has 29 to 34 characters
+    assert [metadata['pair'][1] for regular, easy, metadata in pairs.pairs(max_tokens=5, length=len)] == []
+    assert [metadata['pair'][1] for regular, easy, metadata in pairs.pairs(max_tokens=40, length=len)] == [0, 1]
+    pairs = EasyGermanPairs(dir_regular=str(tmp_path / 'all_regular'), dir_easy=str(tmp_path / 'all_easy'),
+                            removed=str(removed))
+    assert [metadata['pair'][1] for regular, easy, metadata in pairs.pairs()] == [0]
+    with pytest.raises(ValueError):
+        list(pairs.pairs(date_from='2023-01-01'))
+
+
+def test_undated_pairs_are_left_out_by_date_filters(tmp_path):
+    write_corpus(tmp_path)
+    pairs = EasyGermanPairs(dir_regular=str(tmp_path / 'all_regular'), dir_easy=str(tmp_path / 'all_easy'),
+                            metadata=str(tmp_path / 'metadata'))
+    assert [regular for regular, easy, metadata in pairs.pairs()] == [
+        DOCUMENTS['r0_mdr_test_2023.txt'], DOCUMENTS['r1_mdr_test_2023.txt']]
+    assert [metadata['pair'] for regular, easy, metadata in pairs.pairs(date_from='2023-01-01')] == [
+        ('mdr_test_2023.txt', 0)]
+    assert [metadata['pair'] for regular, easy, metadata in pairs.pairs(date_to='2023-12-31')] == [
+        ('mdr_test_2023.txt', 0)]
+    assert [metadata['pair'] for regular, easy, metadata in pairs.pairs(keywords=['Sport'])] == [
+        ('mdr_test_2023.txt', 1)]
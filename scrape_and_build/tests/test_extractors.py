@@ -0,0 +1,45 @@
+import json
+import os
+import pytest
+
+pytest.importorskip('bs4')
+pytest.importorskip('lxml')
+from extractors import Bs4Page, LxmlPage, MalformedPageError, parse_page  # noqa: E402
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+# title and paragraphs of every fixture page as read by the reference extractor
+with open(os.path.join(PAGES, 'expected.json'), encoding='utf-8') as expected_file:
+    EXPECTED = json.load(expected_file)
+MALFORMED = ['block_inside_paragraph.html', 'list_inside_paragraph.html', 'nested_paragraphs.html',
+             'title_with_markup.html', 'unclosed_tags.html']
+
+
+def read_page(name):
+    with open(os.path.join(PAGES, name), 'rb') as file:
+        return file.read()
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED))
+@pytest.mark.parametrize('extractor', ['bs4', 'lxml'])
+def test_extractors_match_golden_output(name, extractor):
+    page = parse_page(read_page(name), extractor)
+    assert page.title() == EXPECTED[name]['title']
+    assert page.paragraphs() == EXPECTED[name]['paragraphs']
+
+
+@pytest.mark.parametrize('name', sorted(set(EXPECTED) - set(MALFORMED)))
+def test_well_formed_pages_are_read_by_lxml(name):
+    content = read_page(name)
+    page = LxmlPage(content)
+    reference = Bs4Page(content)
+    assert page.title() == reference.title()
+    assert page.paragraphs() == reference.paragraphs()
+    for meta in ['date', 'description', 'keywords']:
+        assert page.meta(meta) == reference.meta(meta)
+
+
+@pytest.mark.parametrize('name', MALFORMED)
+def test_malformed_pages_are_left_to_the_reference_extractor(name):
+    with pytest.raises(MalformedPageError):
+        LxmlPage(read_page(name))
+    assert isinstance(parse_page(read_page(name), 'lxml'), Bs4Page)
@@ -0,0 +1,42 @@
+import sqlite3
+from fetch_journal import FetchJournal
+
+
+# urls recorded in a journal as seen by another connection, i.e. the urls that were committed
+def committed_urls(path):
+    connection = sqlite3.connect(path)
+    urls = [row[0] for row in connection.execute('SELECT url FROM urls ORDER BY url')]
+    connection.close()
+    return urls
+
+
+def test_records_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = FetchJournal(path, commit_interval=3)
+    journal.record('http://host/0', 200, {'ETag': '"0"'}, 'hash0')
+    journal.record_failure('http://host/1')
+    assert committed_urls(path) == []
+    assert journal.lookup('http://host/0')['etag'] == '"0"'
+    assert journal.lookup('http://host/1')['status'] == 'failed'
+    journal.record('http://host/2', 404, {}, 'hash2')
+    assert committed_urls(path) == ['http://host/0', 'http://host/1', 'http://host/2']
+    journal.record('http://host/3', 200, {}, 'hash3')
+    journal.close()
+    assert committed_urls(path) == ['http://host/0', 'http://host/1', 'http://host/2', 'http://host/3']
+
+
+def test_finished_url_file_commits_its_urls(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    url_file = tmp_path / 'mdr_test_2023.txt'
+    url_file.write_text('http://host/0\nhttp://host/1\n')
+    journal = FetchJournal(path)
+    journal.record('http://host/0', 200, {}, 'hash0')
+    assert not journal.mark_file_done(str(url_file))
+    assert committed_urls(path) == ['http://host/0']
+    journal.record('http://host/1', 200, {}, 'hash1')
+    assert journal.mark_file_done(str(url_file))
+    assert committed_urls(path) == ['http://host/0', 'http://host/1']
+    assert journal.file_done(str(url_file))
+    url_file.write_text('http://host/0\nhttp://host/1\nhttp://host/2\n')
+    assert not journal.file_done(str(url_file))
+    journal.close()
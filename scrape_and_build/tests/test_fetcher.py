@@ -0,0 +1,92 @@
+import threading
+import pytest
+
+pytest.importorskip('requests')
+import fetcher  # noqa: E402
+from fetcher import Fetcher  # noqa: E402
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: E402
+
+
+# local server answering every request with the next status of the given list, the last one is repeated
+def serve(statuses):
+    requests_received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body are written separately, so without this every response of a kept alive
+        # connection waits for the delayed ack of the client
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            status = statuses[min(len(requests_received), len(statuses) - 1)]
+            requests_received.append(self.path)
+            content = b'<html>page</html>' if status == 200 else b''
+            self.send_response(status)
+            if status == 503:
+                self.send_header('Retry-After', '3')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, requests_received
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fetcher.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_retries_wait_for_the_rate_limiter_and_the_backoff(sleeps):
+    server, requests_received = serve([500, 503, 200])
+    page_fetcher = Fetcher()
+    waits = []
+    wait = page_fetcher.rate_limiter.wait
+    page_fetcher.rate_limiter.wait = lambda url: waits.append(url) or wait(url)
+    url = 'http://127.0.0.1:{0}/page'.format(server.server_port)
+    try:
+        assert page_fetcher.fetch(url) == b'<html>page</html>'
+    finally:
+        page_fetcher.close()
+        server.shutdown()
+        server.server_close()
+    assert len(requests_received) == 3
+    assert waits == [url] * 3
+    # the Retry-After of the 503 response is shorter than the backoff of the second retry
+    assert sleeps == [2, 4]
+    assert page_fetcher.report.counters['retries'] == 2
+
+
+def test_last_response_is_returned_when_retries_are_used_up(sleeps):
+    server, requests_received = serve([500])
+    page_fetcher = Fetcher()
+    try:
+        page = page_fetcher.get('http://127.0.0.1:{0}/page'.format(server.server_port), {})
+    finally:
+        page_fetcher.close()
+        server.shutdown()
+        server.server_close()
+    assert page.status_code == 500
+    assert len(requests_received) == fetcher.RETRIES + 1
+    assert sleeps == [min(fetcher.BACKOFF_FACTOR * 2 ** attempt, fetcher.BACKOFF_MAX)
+                      for attempt in range(fetcher.RETRIES)]
+    # the backoff stops doubling at its maximum, so the last retries wait the same time
+    assert sleeps[-2:] == [fetcher.BACKOFF_MAX, fetcher.BACKOFF_MAX]
+
+
+def test_retry_delay_honours_retry_after():
+    class Page:
+        headers = {'Retry-After': '30'}
+
+    assert fetcher.retry_delay(1) == 2
+    assert fetcher.retry_delay(3) == 8
+    assert fetcher.retry_delay(1, Page()) == 30
+    assert fetcher.retry_delay(fetcher.RETRIES) == fetcher.BACKOFF_MAX
+    Page.headers = {'Retry-After': '86400'}
+    assert fetcher.retry_delay(1, Page()) == fetcher.RETRY_AFTER_MAX
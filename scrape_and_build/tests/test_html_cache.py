@@ -0,0 +1,46 @@
+import os
+from html_cache import HtmlCache, content_hash
+
+
+def test_store_and_load(tmp_path):
+    cache = HtmlCache(str(tmp_path), 0)
+    key = cache.store(b'<html>page</html>')
+    assert key == content_hash(b'<html>page</html>')
+    assert cache.load(key) == b'<html>page</html>'
+    assert cache.load(content_hash(b'missing')) is None
+
+
+def test_size_is_read_once_when_opened(tmp_path):
+    cache = HtmlCache(str(tmp_path), 0)
+    cache.store(b'first page')
+    cache.store(b'second page')
+    cache.store(b'first page')
+    reopened = HtmlCache(str(tmp_path), 0)
+    assert reopened.size == cache.size == sum(os.path.getsize(path) for path in cache.cached_files())
+    assert len(reopened.entries) == 2
+
+
+def test_evicts_least_recently_used_pages_to_low_water_mark(tmp_path):
+    pages = [os.urandom(1000) for _ in range(10)]
+    cache = HtmlCache(str(tmp_path), 0)
+    keys = [cache.store(page) for page in pages]
+    page_size = cache.size // 10
+    cache.max_size = page_size * 10
+    # use the first page, so that the second one is now the least recently used
+    cache.load(keys[0])
+    cache.store(os.urandom(1000))
+    assert cache.size <= cache.max_size * 0.9
+    assert cache.load(keys[0]) == pages[0]
+    assert cache.load(keys[1]) is None
+    assert cache.size == sum(os.path.getsize(path) for path in cache.cached_files())
+
+
+def test_load_ignores_page_evicted_after_read(tmp_path, monkeypatch):
+    cache = HtmlCache(str(tmp_path), 0)
+    key = cache.store(b'page')
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'utime', evicted)
+    assert cache.load(key) == b'page'
@@ -0,0 +1,43 @@
+import os
+from manifest import Manifest
+
+
+def test_lookup_by_version(tmp_path):
+    manifest = Manifest()
+    path = str(tmp_path / 'r0_a.txt')
+    assert manifest.lookup(path, (1, 10)) is None
+    manifest.record(path, (1, 10), 'key')
+    assert manifest.lookup(path, (1, 10)) == 'key'
+    assert manifest.lookup(os.path.relpath(path), (1, 10)) == 'key'
+    assert manifest.lookup(path, (2, 10)) is None
+
+
+def test_text_is_known_with_metrics_and_status():
+    manifest = Manifest()
+    manifest.add('key', (10, 2, 40, 8))
+    assert 'key' not in manifest
+    manifest.add_status('key', 'empty')
+    assert 'key' in manifest
+    assert manifest.get('key') == (10, 2, 40, 8)
+    assert manifest.status('key') == 'empty'
+    assert manifest.length('tokenizer', 'key') is None
+    manifest.add_length('tokenizer', 'key', 12)
+    assert manifest.length('tokenizer', 'key') == 12
+
+
+def test_save_keeps_only_entries_of_files_seen(tmp_path):
+    path = str(tmp_path / 'manifest.pkl')
+    manifest = Manifest(path)
+    for name, key in [('r0_a.txt', 'kept'), ('r1_a.txt', 'dropped')]:
+        manifest.record(str(tmp_path / name), (1, 1), key)
+        manifest.add(key, (1, 1, 1, 1))
+        manifest.add_status(key, '')
+        manifest.add_length('tokenizer', key, 1)
+    manifest.save()
+    manifest = Manifest(path)
+    assert manifest.lookup(str(tmp_path / 'r0_a.txt'), (1, 1)) == 'kept'
+    manifest.save()
+    manifest = Manifest(path)
+    assert 'kept' in manifest and 'dropped' not in manifest
+    assert manifest.lookup(str(tmp_path / 'r1_a.txt'), (1, 1)) is None
+    assert manifest.length('tokenizer', 'kept') == 1 and manifest.length('tokenizer', 'dropped') is None
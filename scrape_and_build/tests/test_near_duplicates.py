@@ -0,0 +1,41 @@
+import random
+import pytest
+
+pytest.importorskip('numpy')
+from near_duplicates import NearDuplicateIndex, shingles  # noqa: E402
+
+WORDS = ['Haus', 'Stadt', 'Wetter', 'Regen', 'Sonne', 'heute', 'morgen', 'Leipzig', 'Dresden', 'Schule', 'Kinder',
+         'Bus', 'Bahn', 'fahren', 'gehen', 'sagen', 'neu', 'alt', 'groß', 'klein']
+
+
+def random_text(generator, words=300):
+    return ' '.join(generator.choice(WORDS) for _ in range(words))
+
+
+def test_shingles():
+    assert shingles('a b c d e f g', size=5) == {'a b c d e', 'b c d e f', 'c d e f g'}
+    assert shingles('a  b\nc', size=5) == {'a b c'}
+    assert shingles('') == {''}
+
+
+def test_find_near_duplicates():
+    generator = random.Random(1)
+    original = random_text(generator)
+    words = original.split()
+    words[150] = 'Änderung'
+    near_duplicate = ' '.join(words)
+    index = NearDuplicateIndex(0.8)
+    assert index.find_or_add('r0_a.txt', original) == (None, 0)
+    assert index.find_or_add('r1_a.txt', random_text(generator)) == (None, 0)
+    original_name, similarity = index.find_or_add('r2_a.txt', near_duplicate)
+    assert original_name == 'r0_a.txt'
+    assert 0.8 <= similarity < 1
+    assert index.find_or_add('r3_a.txt', original) == ('r0_a.txt', 1.0)
+    # documents that were found as near duplicates are not added to the index
+    assert 'r2_a.txt' not in index.signatures and 'r3_a.txt' not in index.signatures
+
+
+def test_signatures_do_not_depend_on_the_instance():
+    generator = random.Random(2)
+    text = random_text(generator)
+    assert (NearDuplicateIndex(0.9).signature(text) == NearDuplicateIndex(0.5).signature(text)).all()
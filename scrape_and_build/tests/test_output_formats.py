@@ -0,0 +1,33 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+from output_formats import EXTENSIONS, TableWriter, read_table, write_table  # noqa: E402
+
+ROWS = [['Ein Text, mit Komma.', 'Ein "Zitat"\nin zwei Zeilen.'], ['', 'Leichte Sprache']]
+COLUMNS = ['Regular German', 'Leichte Sprache']
+
+
+def output_format(name):
+    if name != 'csv':
+        pytest.importorskip('pyarrow')
+    return name
+
+
+@pytest.mark.parametrize('name', ['csv', 'parquet', 'arrow'])
+def test_write_and_read_table(tmp_path, name):
+    path = str(tmp_path / 'EasyGerman_1024')
+    write_table(pd.DataFrame(ROWS, columns=COLUMNS), path, output_format(name))
+    table = read_table(path + EXTENSIONS[name])
+    assert table.columns.tolist() == COLUMNS
+    assert table.values.tolist() == ROWS
+    assert read_table(path + EXTENSIONS[name], ['Leichte Sprache']).columns.tolist() == ['Leichte Sprache']
+
+
+@pytest.mark.parametrize('name', ['csv', 'parquet', 'arrow'])
+def test_table_writer_writes_the_same_table(tmp_path, name):
+    path = str(tmp_path / 'EasyGerman_1024')
+    with TableWriter(path, COLUMNS, output_format(name), batch_size=1) as writer:
+        for row in ROWS * 3:
+            writer.write(row)
+    write_table(pd.DataFrame(ROWS * 3, columns=COLUMNS), path + '_frame', name)
+    assert read_table(path + EXTENSIONS[name]).equals(read_table(path + '_frame' + EXTENSIONS[name]))
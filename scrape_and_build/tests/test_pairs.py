@@ -0,0 +1,43 @@
+from article_store import DirectoryView
+from pairs import PairIndex, document_order, parse_document_name, read_pair_index
+
+
+def test_parse_document_name():
+    assert parse_document_name('r3_mdr_aug_2021.txt') == (('mdr_aug_2021.txt', 3), 'r')
+    assert parse_document_name('e12_mdr_02.10-06.10.txt') == (('mdr_02.10-06.10.txt', 12), 'e')
+    assert parse_document_name('x3_mdr_aug_2021.txt') == (None, None)
+    assert parse_document_name('.DS_Store') == (None, None)
+
+
+def test_document_order_is_by_pair_id():
+    names = ['r10_mdr_aug_2021.txt', 'r1_mdr_aug_2021.txt', 'e1_mdr_aug_2021.txt', 'r2_mdr_2020.txt', '.DS_Store']
+    assert sorted(names, key=document_order) == ['.DS_Store', 'r2_mdr_2020.txt', 'e1_mdr_aug_2021.txt',
+                                                 'r1_mdr_aug_2021.txt', 'r10_mdr_aug_2021.txt']
+
+
+def test_partner_and_unpaired():
+    pairs = PairIndex(['r0_a.txt', 'e0_a.txt', 'r1_a.txt', 'e0_b.txt', 'notes.txt'])
+    assert len(pairs) == 3
+    assert pairs.partner('r0_a.txt') == 'e0_a.txt'
+    assert pairs.partner('e0_a.txt') == 'r0_a.txt'
+    assert pairs.partner('r1_a.txt') is None
+    assert pairs.partner('notes.txt') is None
+    assert pairs.pair_id('e0_b.txt') == ('b.txt', 0)
+    assert pairs.unpaired() == ['e0_b.txt', 'r1_a.txt']
+
+
+def test_complete_pairs_are_ordered_and_filtered_by_blacklist():
+    pairs = PairIndex(['e10_a.txt', 'r2_a.txt', 'r10_a.txt', 'e2_a.txt', 'r0_b.txt', 'e0_b.txt', 'r5_a.txt'])
+    assert list(pairs.complete_pairs()) == [('r2_a.txt', 'e2_a.txt'), ('r10_a.txt', 'e10_a.txt'),
+                                            ('r0_b.txt', 'e0_b.txt')]
+    assert list(pairs.complete_pairs({'e2_a.txt', 'r0_b.txt'})) == [('r10_a.txt', 'e10_a.txt')]
+
+
+def test_read_pair_index_of_directories(tmp_path):
+    for directory, names in [('all_regular', ['r0_a.txt', 'r1_a.txt']), ('all_easy', ['e0_a.txt'])]:
+        (tmp_path / directory).mkdir()
+        for name in names:
+            (tmp_path / directory / name).write_text('')
+    pairs = read_pair_index(DirectoryView(str(tmp_path / 'all_regular')), DirectoryView(str(tmp_path / 'all_easy')))
+    assert list(pairs.complete_pairs()) == [('r0_a.txt', 'e0_a.txt')]
+    assert pairs.unpaired() == ['r1_a.txt']
@@ -0,0 +1,20 @@
+import pytest
+
+tokenizers = pytest.importorskip('tokenizers')
+from subword_lengths import SubwordTokenizer  # noqa: E402
+
+
+# tokenizer.json of a word level tokenizer that pads and truncates every text to three tokens
+def write_tokenizer(directory):
+    vocabulary = {'[UNK]': 0, '[PAD]': 1, 'ein': 2, 'kurzer': 3, 'text': 4}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocabulary, unk_token='[UNK]'))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.enable_padding(pad_id=1, pad_token='[PAD]', length=3)
+    tokenizer.enable_truncation(max_length=3)
+    tokenizer.save(str(directory / 'tokenizer.json'))
+
+
+def test_lengths_are_neither_padded_nor_truncated(tmp_path):
+    write_tokenizer(tmp_path)
+    tokenizer = SubwordTokenizer(str(tmp_path), batch_size=2)
+    assert tokenizer.lengths(['ein', 'ein kurzer text', 'ein kurzer text ein kurzer text']) == [1, 3, 6]
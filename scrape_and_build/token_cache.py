@@ -0,0 +1,43 @@
+import hashlib
+import os
+import pickle
+
+
+# hash identifying the text of a document, documents with the same text share their tokens
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# tokens and per-document statistics of every unique document text, keyed by the hash of the text and optionally kept
+# on disk so that a later build does not tokenize unchanged documents again
+class TokenCache:
+    def __init__(self, path=None):
+        self.path = path
+        self.documents = {}
+        if path and os.path.exists(path):
+            with open(path, 'rb') as file:
+                self.documents = pickle.load(file)
+
+    def __contains__(self, key):
+        return key in self.documents
+
+    def __len__(self):
+        return len(self.documents)
+
+    # get the tokens, number of sentences, number of letters and vocabulary size of a document
+    def get(self, key):
+        return self.documents[key]
+
+    def add(self, key, analysis):
+        self.documents[key] = analysis
+
+    def tokens(self, key):
+        return self.documents[key][0]
+
+    def save(self):
+        if not self.path:
+            return
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(self.documents, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,138 @@
+import numpy as np
+import os
+import pandas as pd
+import re
+from corpus_statistics import VOCABULARY_WORD
+from nltk.corpus import stopwords
+from scipy import sparse
+
+# words that are left out of the cleaned vocabulary besides the stop words
+NOT_CLEANED = re.compile('(mdr.de)')
+
+
+# sparse term-document matrix of token counts, every token is interned to an integer id once and each document is
+# stored as the ids and counts of its distinct tokens
+class TermDocumentMatrix:
+    def __init__(self):
+        self.term_ids = {}
+        self.documents = []
+        self.keys = []
+        self.indptr = [0]
+        self.indices = []
+        self.counts = []
+        self.built_matrix = None
+
+    def add(self, document, tokens, key=''):
+        term_ids = self.term_ids
+        ids = np.fromiter((term_ids.setdefault(token, len(term_ids)) for token in tokens), dtype=np.int64,
+                          count=len(tokens))
+        ids, counts = np.unique(ids, return_counts=True)
+        self.add_counts(document, ids, counts, key)
+
+    # add a document from the ids and counts of its distinct tokens
+    def add_counts(self, document, ids, counts, key=''):
+        self.indices.append(ids)
+        self.counts.append(counts)
+        self.indptr.append(self.indptr[-1] + len(ids))
+        self.documents.append(document)
+        self.keys.append(key)
+        self.built_matrix = None
+
+    # add a document from the terms and counts of its distinct tokens, e.g. a row of the matrix of a previous build
+    def add_terms(self, document, terms, counts, key=''):
+        term_ids = self.term_ids
+        ids = np.fromiter((term_ids.setdefault(term, len(term_ids)) for term in terms), dtype=np.int64,
+                          count=len(terms))
+        self.add_counts(document, ids, counts, key)
+
+    # terms ordered by their id
+    def terms(self):
+        return list(self.term_ids)
+
+    # csr matrix with one row per document and one column per term, built once after the last document was added
+    def matrix(self):
+        if self.built_matrix is None:
+            indices = np.concatenate(self.indices) if self.indices else np.zeros(0, dtype=np.int64)
+            counts = np.concatenate(self.counts) if self.counts else np.zeros(0, dtype=np.int64)
+            self.built_matrix = sparse.csr_matrix((counts, indices, np.array(self.indptr, dtype=np.int64)),
+                                                  shape=(len(self.documents), len(self.term_ids)))
+        return self.built_matrix
+
+    # save matrix, terms, document names and text hashes to a single compressed numpy file
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        matrix = self.matrix()
+        np.savez_compressed(path, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                            shape=np.array(matrix.shape), terms=np.array(self.terms(), dtype=str),
+                            documents=np.array(self.documents, dtype=str), keys=np.array(self.keys, dtype=str))
+
+
+# load a term-document matrix saved by TermDocumentMatrix.save, returns the matrix, its terms, document names and the
+# text hash of each document
+def load_term_document_matrix(path):
+    with np.load(path) as file:
+        matrix = sparse.csr_matrix((file['data'], file['indices'], file['indptr']), shape=tuple(file['shape']))
+        keys = file['keys'].tolist() if 'keys' in file.files else [''] * matrix.shape[0]
+        return matrix, file['terms'].tolist(), file['documents'].tolist(), keys
+
+
+# terms and counts of every document of a saved term-document matrix by its text hash, so that a build can reuse the
+# counts of documents that did not change instead of tokenizing them again, empty if there is no saved matrix
+def load_term_counts(path):
+    if not os.path.exists(path):
+        return {}
+    matrix, terms, documents, keys = load_term_document_matrix(path)
+    terms = np.array(terms, dtype=object)
+    term_counts = {}
+    for row, key in enumerate(keys):
+        if key:
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            term_counts[key] = (terms[matrix.indices[start:end]], matrix.data[start:end])
+    return term_counts
+
+
+# mask of the terms that are counted as words of the vocabulary
+def word_mask(terms):
+    return np.array([bool(VOCABULARY_WORD.match(term)) for term in terms], dtype=bool)
+
+
+# number of distinct words in each group of documents, given the group of every row of the matrix
+def group_vocabulary_sizes(matrix, terms, groups):
+    words = word_mask(terms)
+    groups = np.array(groups, dtype=object)
+    sizes = {}
+    for group in sorted(set(groups)):
+        totals = np.asarray(matrix[np.flatnonzero(groups == group)].sum(axis=0)).ravel()
+        sizes[group] = int(np.count_nonzero(totals[words]))
+    return sizes
+
+
+# frequencies of all words and of the cleaned words without stop words, given the total count of every distinct term
+def word_frequencies(terms, totals):
+    terms = np.array(terms, dtype=object)
+    totals = np.asarray(totals, dtype=np.int64)
+    german_stop_words = set(stopwords.words('german'))
+    words = word_mask(terms)
+    cleaned = words & np.array([term.lower() not in german_stop_words and not NOT_CLEANED.match(term.lower())
+                                for term in terms], dtype=bool)
+    word_freq_total = pd.Series(totals[words], index=terms[words]).sort_values(ascending=False, kind='stable')
+    word_freq_cleaned = pd.Series(totals[cleaned], index=terms[cleaned]).sort_values(ascending=False, kind='stable')
+    return word_freq_total, word_freq_cleaned
+
+
+# frequencies of all words and of the cleaned words without stop words, every distinct term is checked once instead of
+# every token
+def vocabulary_statistics(matrix, terms):
+    return word_frequencies(terms, np.asarray(matrix.sum(axis=0)).ravel())
+
+
+# frequencies of all words and of the cleaned words from a counter of the tokens of many documents, used when the
+# documents are streamed and no term-document matrix is built
+def counter_statistics(term_counts):
+    return word_frequencies(list(term_counts), np.fromiter(term_counts.values(), dtype=np.int64,
+                                                           count=len(term_counts)))
+
+
+# number of distinct words in a counter of tokens
+def counter_vocabulary_size(term_counts):
+    return int(np.count_nonzero(word_mask(list(term_counts))))